@@ -7,15 +7,26 @@ import sys
 import os
 import time
 import json
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 
-from flask import Flask, request, jsonify, g, render_template_string
+from flask import Flask, Response, request, jsonify, g, render_template_string
 from werkzeug.middleware.proxy_fix import ProxyFix
+import orjson
+import xxhash
 import structlog
-from prometheus_client import Counter, Histogram, generate_latest
+from cachetools import LRUCache
+from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
 from flask_cors import CORS
 
+from utils.batching import BatchCoalescer
+from utils.phrases import PhraseMatcher
+from utils.serialization import OrjsonProvider, orjson_dumps
+
 # Configure structured logging
 structlog.configure(
     processors=[
@@ -27,7 +38,7 @@ structlog.configure(
         structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
         structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer()
+        structlog.processors.JSONRenderer(serializer=orjson_dumps)
     ],
     context_class=dict,
     logger_factory=structlog.stdlib.LoggerFactory(),
@@ -39,36 +50,175 @@ logger = structlog.get_logger()
 
 # Prometheus metrics
 REQUEST_COUNT = Counter('translation_requests_total', 'Total translation requests', ['method', 'endpoint'])
-REQUEST_LATENCY = Histogram('translation_request_duration_seconds', 'Translation request latency')
+REQUEST_LATENCY = Histogram('translation_request_duration_seconds', 'Translation request latency',
+                            buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+
+# Endpoint label values are limited to the registered routes
+METRIC_ENDPOINTS = frozenset({
+    'serve_web_app', 'health_check', 'metrics', 'translate', 'get_languages', 'batch_translate'
+})
+
+# Where INT8 ONNX exports of the translation models are cached between runs
+ONNX_CACHE_DIR = os.getenv('ONNX_CACHE_DIR', os.path.expanduser('~/.cache/lingua'))
+
+def onnx_model_dir(model_name: str) -> str:
+    """Cache directory of a model's INT8 ONNX export"""
+    return os.path.join(ONNX_CACHE_DIR, model_name.replace("/", "--"))
+
+def export_quantized_model(model_name: str) -> str:
+    """
+    Export a MarianMT model to ONNX and quantize it to INT8 in the cache
+
+    The export is built in a scratch directory and renamed into place once
+    complete, so an interrupted export leaves nothing behind and parallel
+    exports of the same model never mix their files.
+    """
+    from transformers import AutoTokenizer
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    
+    quantized_dir = onnx_model_dir(model_name)
+    os.makedirs(ONNX_CACHE_DIR, exist_ok=True)
+    scratch_dir = tempfile.mkdtemp(prefix=".export-", dir=ONNX_CACHE_DIR)
+    try:
+        export_dir = os.path.join(scratch_dir, "fp32")
+        staged_dir = os.path.join(scratch_dir, "int8")
+        model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True)
+        model.save_pretrained(export_dir)
+        
+        # Dynamic quantization; VNNI int8 dot-products where the CPU has them
+        qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        for file_name in sorted(os.listdir(export_dir)):
+            if file_name.endswith(".onnx"):
+                quantizer = ORTQuantizer.from_pretrained(export_dir, file_name=file_name)
+                quantizer.quantize(save_dir=staged_dir, quantization_config=qconfig)
+        model.config.save_pretrained(staged_dir)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(staged_dir)
+        
+        try:
+            os.replace(staged_dir, quantized_dir)
+        except OSError:
+            # Another process finished the same export first
+            if not os.path.isdir(quantized_dir):
+                raise
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+    return quantized_dir
+
+# Last rendered second and its ISO-8601 string, shared by the health endpoints
+_ts_cache = [0, ""]
+
+def iso_now() -> str:
+    """Current UTC time as ISO-8601, formatted at most once per second"""
+    now = int(time.time())
+    if now != _ts_cache[0]:
+        _ts_cache[:] = [now, datetime.utcfromtimestamp(now).isoformat() + "Z"]
+    return _ts_cache[1]
+
+# MarianMT models behind each AI-backed target language (Spanish, Arabic, Chinese)
+AI_MODEL_NAMES = {
+    "es": "Helsinki-NLP/opus-mt-en-es",
+    "ar": "Helsinki-NLP/opus-mt-en-ar",
+    "zh": "Helsinki-NLP/opus-mt-en-zh"
+}
+
+# Required /translate fields: (type, type name for errors, min length, max length)
+TRANSLATE_SCHEMA = {
+    'text': (str, 'string', 1, 1000),  # Reduced for Codespaces
+}
 
 class SimpleRateLimiter:
-    """Simple in-memory rate limiter"""
-    def __init__(self):
-        self.requests = {}
+    """Simple in-memory token-bucket rate limiter"""
+    __slots__ = ("buckets", "limit", "refill_rate", "max_clients", "lock")
+    
+    def __init__(self, max_clients: int = 100_000):
+        self.buckets = OrderedDict()  # client_ip -> (tokens, last_refill)
         self.limit = 100  # requests per minute
+        self.refill_rate = self.limit / 60.0  # tokens per second
+        self.max_clients = max_clients
+        self.lock = threading.Lock()
         
     def is_allowed(self, client_ip: str) -> bool:
-        current_time = time.time()
-        minute_key = int(current_time // 60)
+        now = time.monotonic()
         
-        if client_ip not in self.requests:
-            self.requests[client_ip] = {}
+        with self.lock:
+            tokens, last_refill = self.buckets.get(client_ip, (self.limit, now))
+            tokens = min(self.limit, tokens + (now - last_refill) * self.refill_rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            
+            self.buckets[client_ip] = (tokens, now)
+            self.buckets.move_to_end(client_ip)
+            # Forget the least recently seen clients beyond the cap
+            while len(self.buckets) > self.max_clients:
+                self.buckets.popitem(last=False)
         
-        # Clean old entries
-        self.requests[client_ip] = {
-            k: v for k, v in self.requests[client_ip].items() 
-            if k >= minute_key - 1
-        }
+        return allowed
+
+class SlidingWindowRateLimiter:
+    """Per-minute rate limiter using a weighted two-window sliding approximation"""
+    __slots__ = ("limit", "current", "previous", "current_minute", "lock")
+    
+    def __init__(self):
+        self.limit = 100  # requests per minute
+        self.current = {}  # client_ip -> count in the current minute
+        self.previous = {}  # client_ip -> count in the previous minute
+        self.current_minute = int(time.time() // 60)
+        self.lock = threading.Lock()
+        
+    def is_allowed(self, client_ip: str) -> bool:
+        now = time.time()
+        minute = int(now // 60)
         
-        current_count = self.requests[client_ip].get(minute_key, 0)
-        if current_count >= self.limit:
-            return False
+        with self.lock:
+            if minute != self.current_minute:
+                # Rotate windows; anything older than one minute is dropped wholesale
+                self.previous = self.current if minute == self.current_minute + 1 else {}
+                self.current = {}
+                self.current_minute = minute
+            
+            count = self.current.get(client_ip, 0)
+            # Weight the previous minute by how much of it still overlaps the window
+            weighted = count + self.previous.get(client_ip, 0) * (1 - (now % 60) / 60)
+            if weighted >= self.limit:
+                return False
             
-        self.requests[client_ip][minute_key] = current_count + 1
+            self.current[client_ip] = count + 1
+        
         return True
 
+RATE_LIMITERS = {
+    'token_bucket': SimpleRateLimiter,
+    'sliding_window': SlidingWindowRateLimiter,
+}
+
+class _GreedyTranslator:
+    """Tokenizer + seq2seq model pair decoded greedily in one generate() call"""
+
+    def __init__(self, tokenizer, model, max_length: int = 512):
+        import torch
+
+        self.torch = torch
+        self.tokenizer = tokenizer
+        self.model = model
+        self.max_length = max_length
+
+    def __call__(self, texts: List[str]) -> List[str]:
+        inputs = self.tokenizer(texts, return_tensors="pt", padding=True,
+                                truncation=True, max_length=self.max_length)
+        # Grad mode is per thread, so the loader's set_grad_enabled(False) doesn't
+        # reach the coalescer thread; inference_mode also skips version counters
+        with self.torch.inference_mode():
+            # Greedy decoding: a quarter of the decoder work of MarianMT's default 4 beams
+            outputs = self.model.generate(**inputs, num_beams=1, do_sample=False,
+                                          max_new_tokens=self.max_length, use_cache=True)
+        return self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
 class LightweightTranslationEngine:
     """Lightweight translation engine optimized for Codespaces"""
+    __slots__ = ("supported_languages", "translations", "_phrase_matcher", "_max_phrase_len",
+                 "ai_models", "batchers", "_model_locks", "_unavailable_models", "_use_onnx")
     
     def __init__(self):
         # Only 4 essential languages: English (input), Spanish, Arabic, Chinese
@@ -198,57 +348,138 @@ class LightweightTranslationEngine:
             }
         }
         
-        # Load FAANG-level AI models for essential languages
+        # One Aho-Corasick automaton per language for in-text phrase matching
+        self._phrase_matcher = PhraseMatcher(self.translations)
+        # Longest known phrase; longer inputs can never be an exact dictionary hit
+        self._max_phrase_len = max(len(phrase) for phrases in self.translations.values() for phrase in phrases)
+        
+        # FAANG-level AI models for essential languages, loaded on first use
         self.ai_models = {}
+        self.batchers = {}  # One request coalescer per loaded model
+        self._model_locks = {lang: threading.Lock() for lang in AI_MODEL_NAMES}
+        self._unavailable_models = set()
+        self._use_onnx = False
         self._load_faang_ai_models()
     
     def _load_faang_ai_models(self):
-        """Load AI models for FAANG-level performance"""
+        """Prepare the AI runtime and preload the models named in PRELOAD_LANGUAGES
+
+        Other models are loaded on first use by _ensure_model. Under
+        gunicorn --preload, list the busiest target languages so their
+        weights are loaded before fork and shared by every worker.
+        """
+        # Explicit intra-op thread count; with several gunicorn workers set
+        # TORCH_THREADS to cores / workers so they don't oversubscribe the CPU
+        num_threads = int(os.getenv('TORCH_THREADS', os.cpu_count() or 1))
+        os.environ.setdefault('OMP_NUM_THREADS', str(num_threads))
         try:
-            from transformers import pipeline
-            
-            # Load AI models for Spanish, Arabic, and Chinese (FAANG quality)
-            models_to_load = {
-                "es": "Helsinki-NLP/opus-mt-en-es",
-                "ar": "Helsinki-NLP/opus-mt-en-ar", 
-                "zh": "Helsinki-NLP/opus-mt-en-zh"
-            }
+            import torch
+            import transformers  # noqa: F401
             
-            for lang, model_name in models_to_load.items():
-                try:
-                    self.ai_models[lang] = pipeline(
-                        "translation",
-                        model=model_name,
-                        device=-1,  # CPU optimized for Codespaces
-                        model_kwargs={
-                            "low_cpu_mem_usage": True,
-                            "torch_dtype": "float32"
-                        }
-                    )
-                    logger.info(f"✅ FAANG-level AI model loaded for {lang}: {model_name}")
-                except Exception as e:
-                    logger.error(f"❌ Failed to load AI model for {lang}: {e}")
-                    
+            # Inference only: no autograd bookkeeping
+            torch.set_grad_enabled(False)
+            torch.set_num_threads(num_threads)
+            # Treat denormal floats as zero instead of taking the slow microcode path
+            torch.set_flush_denormal(True)
         except ImportError:
             logger.error("❌ Transformers not available - install with: pip install transformers torch")
-        except Exception as e:
-            logger.error(f"❌ Failed to initialize AI models: {e}")
+            self._unavailable_models.update(AI_MODEL_NAMES)
+            return
+        
+        try:
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM  # noqa: F401
+            self._use_onnx = True
+        except ImportError:
+            logger.warning("⚠️ optimum not installed - using FP32 PyTorch models "
+                           "(pip install optimum[onnxruntime] for INT8)")
+        
+        for lang in filter(None, os.getenv('PRELOAD_LANGUAGES', '').split(',')):
+            self._ensure_model(lang.strip(), export=True)
+    
+    def _ensure_model(self, lang: str, export: bool = False) -> Optional[BatchCoalescer]:
+        """
+        Return the request coalescer for a language, loading its model on first use
+
+        Only startup passes export=True: a request never waits for an ONNX export
+        and uses the PyTorch model while no export is cached.
+        """
+        batcher = self.batchers.get(lang)
+        if batcher is not None or lang not in self._model_locks:
+            return batcher
+        
+        with self._model_locks[lang]:
+            if lang in self.batchers or lang in self._unavailable_models:
+                return self.batchers.get(lang)
+            
+            model_name = AI_MODEL_NAMES[lang]
+            try:
+                if self._use_onnx and export and not os.path.isdir(onnx_model_dir(model_name)):
+                    logger.info(f"Exporting {model_name} to INT8 ONNX (first run only)")
+                    export_quantized_model(model_name)
+                if self._use_onnx and os.path.isdir(onnx_model_dir(model_name)):
+                    self.ai_models[lang] = self._load_quantized_model(model_name)
+                else:
+                    from transformers import MarianMTModel, MarianTokenizer
+                    self.ai_models[lang] = _GreedyTranslator(
+                        MarianTokenizer.from_pretrained(model_name),
+                        MarianMTModel.from_pretrained(model_name, low_cpu_mem_usage=True).eval()
+                    )
+                self.batchers[lang] = BatchCoalescer(self.ai_models[lang])
+                logger.info(f"✅ FAANG-level AI model loaded for {lang}: {model_name}")
+            except Exception as e:
+                # Don't retry the load on every request
+                self._unavailable_models.add(lang)
+                logger.error(f"❌ Failed to load AI model for {lang}: {e}")
+        
+        return self.batchers.get(lang)
+    
+    def _load_quantized_model(self, model_name: str):
+        """Load the cached INT8 ONNX Runtime export of a model"""
+        from transformers import AutoTokenizer
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        
+        quantized_dir = onnx_model_dir(model_name)
+        model = ORTModelForSeq2SeqLM.from_pretrained(
+            quantized_dir,
+            encoder_file_name="encoder_model_quantized.onnx",
+            decoder_file_name="decoder_model_quantized.onnx",
+            decoder_with_past_file_name="decoder_with_past_model_quantized.onnx"
+        )
+        return _GreedyTranslator(AutoTokenizer.from_pretrained(quantized_dir), model)
     
     def get_supported_languages(self) -> List[str]:
         return self.supported_languages
     
     def translate(self, text: str, source_lang: str = "auto", target_lang: str = "en", 
-                  style: str = "general", context: str = "") -> Dict[str, Any]:
+                  style: str = "general", context: str = "",
+                  normalized_text: Optional[str] = None) -> Dict[str, Any]:
         """
-        Lightweight translation with dictionary-first approach
+        Lightweight translation: exact dictionary phrases, then AI, then dictionary substitution
+        
+        normalized_text may carry text.strip().casefold() when the caller
+        already computed it, so the dictionary lookup skips the rescan.
         """
         start_time = time.time()
         try:
+            # Known phrases are answered straight from the dictionary, no model pass
+            dictionary_translation = self._dictionary_translate(text, target_lang, normalized_text, partial=False)
+            if dictionary_translation is not None:
+                translation_time = time.time() - start_time
+                logger.info("Used dictionary translation", translation_time=translation_time)
+                return {
+                    'translated_text': dictionary_translation,
+                    'detected_language': "en",
+                    'confidence': 0.8,
+                    'translation_time': translation_time,
+                    'method': 'dictionary'
+                }
+            
             # Prioritize AI models for FAANG-level quality
-            if target_lang in self.ai_models and source_lang in ["auto", "en"]:
+            batcher = self._ensure_model(target_lang) if source_lang in ["auto", "en"] else None
+            if batcher is not None:
                 try:
-                    result = self.ai_models[target_lang](text)
-                    translated_text = result[0]['translation_text']
+                    # Concurrent requests for the same language share one forward pass
+                    translated_text = batcher.submit(text)
                     translation_time = time.time() - start_time
                     logger.info(f"🚀 FAANG-level AI translation used for {target_lang}", translation_time=translation_time)
                     return {
@@ -261,8 +492,8 @@ class LightweightTranslationEngine:
                 except Exception as e:
                     logger.warning(f"AI model failed for {target_lang}: {e}")
             
-            # Fallback to dictionary if AI model unavailable
-            dictionary_translation = self._dictionary_translate(text, target_lang)
+            # Fallback to in-text phrase substitution if AI model unavailable
+            dictionary_translation = self._dictionary_translate(text, target_lang, normalized_text)
             if dictionary_translation is not None:
                 translation_time = time.time() - start_time
                 logger.info("Used dictionary fallback", translation_time=translation_time)
@@ -277,8 +508,7 @@ class LightweightTranslationEngine:
             # Fallback to AI model only for Spanish and if available
             if target_lang == "es" and target_lang in self.ai_models and source_lang in ["auto", "en"]:
                 try:
-                    result = self.ai_models[target_lang](text)
-                    translated_text = result[0]['translation_text']
+                    translated_text = self.ai_models[target_lang]([text])[0]
                     translation_time = time.time() - start_time
                     logger.info("Used AI model translation", translation_time=translation_time)
                     return {
@@ -314,23 +544,88 @@ class LightweightTranslationEngine:
                 'method': 'error'
             }
     
-    def _dictionary_translate(self, text: str, target_lang: str) -> Optional[str]:
-        """Fast dictionary lookup translation"""
+    def translate_batch(self, texts: List[str], source_lang: str = "auto",
+                        target_lang: str = "en", style: str = "general") -> List[Dict[str, Any]]:
+        """Translate many texts: dictionary hits first, then one batched model call for the rest"""
+        start_time = time.time()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        misses = []
+        for index, text in enumerate(texts):
+            if not isinstance(text, str):
+                results[index] = self.translate(text, source_lang, target_lang, style)
+                continue
+            dictionary_translation = self._dictionary_translate(text, target_lang, partial=False)
+            if dictionary_translation is not None:
+                results[index] = {
+                    'translated_text': dictionary_translation,
+                    'detected_language': "en",
+                    'confidence': 0.8,
+                    'translation_time': time.time() - start_time,
+                    'method': 'dictionary'
+                }
+            else:
+                misses.append(index)
+        
+        model = None
+        if misses and source_lang in ["auto", "en"] and self._ensure_model(target_lang) is not None:
+            model = self.ai_models[target_lang]
+        if model is not None:
+            try:
+                # All misses share a single padded generate() call
+                translations = model([texts[index] for index in misses])
+                translation_time = time.time() - start_time
+                for index, translated_text in zip(misses, translations):
+                    results[index] = {
+                        'translated_text': translated_text,
+                        'detected_language': "en",
+                        'confidence': 0.95,
+                        'translation_time': translation_time,
+                        'method': 'ai_model_faang'
+                    }
+                misses = []
+            except Exception as e:
+                logger.warning(f"Batched AI model failed for {target_lang}: {e}")
+        
+        for index in misses:
+            text = texts[index]
+            dictionary_translation = self._dictionary_translate(text, target_lang)
+            results[index] = {
+                'translated_text': dictionary_translation if dictionary_translation is not None
+                                   else f"[{target_lang.upper()}] {text}",
+                'detected_language': "en",
+                'confidence': 0.8 if dictionary_translation is not None else 0.1,
+                'translation_time': time.time() - start_time,
+                'method': 'dictionary_fallback' if dictionary_translation is not None else 'fallback'
+            }
+        
+        return results
+    
+    def _dictionary_translate(self, text: str, target_lang: str,
+                              normalized_text: Optional[str] = None,
+                              partial: bool = True) -> Optional[str]:
+        """Fast dictionary lookup translation
+
+        With partial=False only whole-phrase matches are returned; known
+        phrases inside longer text are left for the AI model.
+        """
         if target_lang not in self.translations:
             return None
         
-        text_lower = text.lower().strip()
+        text_lower = normalized_text if normalized_text is not None else text.strip().casefold()
         lang_dict = self.translations[target_lang]
         
-        # Direct phrase match
-        if text_lower in lang_dict:
+        # Direct phrase match (skip the probe when the input is longer than any phrase)
+        if len(text_lower) <= self._max_phrase_len and text_lower in lang_dict:
             return lang_dict[text_lower]
         
-        return None
+        if not partial:
+            return None
+        return self._phrase_matcher.substitute(text, target_lang, text_lower)
 
 class TranslationAPI:
     def __init__(self):
         self.app = Flask(__name__)
+        self.app.json = OrjsonProvider(self.app)
         CORS(self.app)
         self.app.wsgi_app = ProxyFix(self.app.wsgi_app, x_for=1, x_proto=1, x_host=1, x_prefix=1)
         
@@ -343,8 +638,11 @@ class TranslationAPI:
         """Initialize core components with error handling"""
         try:
             self.translator = LightweightTranslationEngine()
-            self.rate_limiter = SimpleRateLimiter()
-            self.cache = {}  # Simple in-memory cache
+            self.rate_limiter = RATE_LIMITERS.get(
+                os.getenv('RATE_LIMIT_STRATEGY', 'token_bucket'), SimpleRateLimiter
+            )()
+            self.cache = LRUCache(maxsize=1024)  # Bounded in-memory cache, evicts least recently used
+            self.cache_lock = threading.Lock()
             logger.info("All components initialized successfully")
         except Exception as e:
             logger.error(f"Component initialization failed: {e}")
@@ -355,7 +653,8 @@ class TranslationAPI:
         @self.app.before_request
         def before_request():
             g.start_time = time.time()
-            REQUEST_COUNT.labels(method=request.method, endpoint=request.endpoint or 'unknown').inc()
+            endpoint = request.endpoint if request.endpoint in METRIC_ENDPOINTS else 'unknown'
+            REQUEST_COUNT.labels(method=request.method, endpoint=endpoint).inc()
 
         @self.app.after_request
         def after_request(response):
@@ -365,18 +664,25 @@ class TranslationAPI:
 
     def _setup_routes(self):
         """Setup API routes"""
+        # Static payloads are encoded once; '/' only splices in its timestamp
+        self._languages_payload = orjson.dumps({
+            'supported_languages': self.translator.get_supported_languages(),
+            'total_count': len(self.translator.get_supported_languages()),
+            'optimized_for': 'codespaces'
+        })
+        self._root_payload_prefix = orjson.dumps({
+            'status': 'healthy',
+            'service': 'lingua-translate-faang-level',
+            'version': '1.0.0-codespaces',
+            'supported_languages': self.translator.get_supported_languages(),
+            'memory_optimized': True
+        })[:-1] + b',"timestamp":"'
         
         @self.app.route('/')
         def serve_web_app():
             """Serve the web application HTML"""
-            return jsonify({
-                'status': 'healthy',
-                'service': 'lingua-translate-faang-level',
-                'version': '1.0.0-codespaces',
-                'timestamp': datetime.utcnow().isoformat(),
-                'supported_languages': self.translator.get_supported_languages(),
-                'memory_optimized': True
-            })
+            timestamp = iso_now().encode()
+            return Response(self._root_payload_prefix + timestamp + b'"}', mimetype='application/json')
 
         @self.app.route('/health')
         def health_check():
@@ -387,7 +693,7 @@ class TranslationAPI:
                 'status': 'healthy',
                 'service': 'lingua-translate-faang-level',
                 'version': '1.0.0-codespaces',
-                'timestamp': datetime.utcnow().isoformat(),
+                'timestamp': iso_now(),
                 'memory_usage': {
                     'available_gb': round(memory_info.available / (1024**3), 2),
                     'percent_used': memory_info.percent
@@ -398,7 +704,7 @@ class TranslationAPI:
         @self.app.route('/metrics')
         def metrics():
             """Prometheus metrics endpoint"""
-            return generate_latest()
+            return Response(generate_latest(), content_type=CONTENT_TYPE_LATEST)
 
         @self.app.route('/translate', methods=['POST'])
         def translate():
@@ -408,11 +714,7 @@ class TranslationAPI:
         @self.app.route('/languages', methods=['GET'])
         def get_languages():
             """Get supported languages"""
-            return jsonify({
-                'supported_languages': self.translator.get_supported_languages(),
-                'total_count': len(self.translator.get_supported_languages()),
-                'optimized_for': 'codespaces'
-            })
+            return Response(self._languages_payload, mimetype='application/json')
 
         @self.app.route('/batch-translate', methods=['POST'])
         def batch_translate():
@@ -441,14 +743,18 @@ class TranslationAPI:
             source_lang = data.get('source_lang', 'auto')
             target_lang = data.get('target_lang', 'es')
             style = data.get('style', 'general')
+            # Normalize once; the dictionary lookup reuses it
+            normalized_text = text.strip().casefold()
 
-            # Check cache
-            cache_key = f"translate:{source_lang}:{target_lang}:{style}:{hash(text)}"
-            if cache_key in self.cache:
+            # Check cache; entries keep the source text so a hash collision is a miss
+            cache_key = xxhash.xxh3_64_intdigest(
+                f"{source_lang}|{target_lang}|{style}|{text}".encode()
+            )
+            with self.cache_lock:
+                cached = self.cache.get(cache_key)
+            if cached is not None and cached[0] == text:
                 logger.info("Cache hit", cache_key=cache_key)
-                response_data = self.cache[cache_key].copy()
-                response_data['cached'] = True
-                return jsonify(response_data)
+                return jsonify({**cached[1], 'cached': True})
 
             # Perform translation
             start_time = time.time()
@@ -456,7 +762,8 @@ class TranslationAPI:
                 text=text,
                 source_lang=source_lang,
                 target_lang=target_lang,
-                style=style
+                style=style,
+                normalized_text=normalized_text
             )
             translation_time = time.time() - start_time
 
@@ -474,9 +781,9 @@ class TranslationAPI:
                 'optimized_for': 'codespaces'
             }
 
-            # Cache result (limit cache size for memory)
-            if len(self.cache) < 100:  # Limit cache size
-                self.cache[cache_key] = response_data.copy()
+            # Cache result; the LRU bound keeps memory flat
+            with self.cache_lock:
+                self.cache[cache_key] = (text, response_data)
 
             logger.info("Translation completed", 
                        source_lang=source_lang, 
@@ -504,20 +811,21 @@ class TranslationAPI:
             target_lang = data.get('target_lang', 'es')
             style = data.get('style', 'general')
 
-            results = []
-            for text in texts:
-                result = self.translator.translate(
-                    text=text,
-                    source_lang=source_lang,
-                    target_lang=target_lang,
-                    style=style
-                )
-                results.append({
+            translations = self.translator.translate_batch(
+                texts=texts,
+                source_lang=source_lang,
+                target_lang=target_lang,
+                style=style
+            )
+            results = [
+                {
                     'original': text,
                     'translated': result['translated_text'],
                     'confidence': result.get('confidence', 0.95),
                     'method': result.get('method', 'unknown')
-                })
+                }
+                for text, result in zip(texts, translations)
+            ]
 
             return jsonify({
                 'results': results,
@@ -536,14 +844,14 @@ class TranslationAPI:
         if not data or not isinstance(data, dict):
             return 'Invalid JSON data'
             
-        if not data.get('text'):
-            return 'Missing required field: text'
-        
-        if not isinstance(data['text'], str):
-            return 'Text must be a string'
-        
-        if len(data['text']) > 1000:  # Reduced for Codespaces
-            return 'Text too long (max 1000 characters for Codespaces)'
+        for field, (field_type, type_name, min_length, max_length) in TRANSLATE_SCHEMA.items():
+            value = data.get(field)
+            if not value:
+                return f'Missing required field: {field}'
+            if not isinstance(value, field_type):
+                return f'{field.capitalize()} must be a {type_name}'
+            if not min_length <= len(value) <= max_length:
+                return f'{field.capitalize()} too long (max {max_length} characters for Codespaces)'
         
         target_lang = data.get('target_lang')
         if target_lang and target_lang not in self.translator.get_supported_languages():
@@ -552,12 +860,28 @@ class TranslationAPI:
         return None
 
     def run(self, host='0.0.0.0', port=5000, debug=False):
-        """Run the Flask application"""
+        """Run the Flask application
+
+        Serves with waitress when it is installed; Flask's development server
+        is only the fallback. For multi-core throughput use gunicorn with
+        --preload so the model weights are loaded once and shared by workers.
+        """
         logger.info(f"Starting FAANG-Level Lingua Translate API on {host}:{port}")
-        self.app.run(host=host, port=port, debug=debug, threaded=True)
+        try:
+            from waitress import serve
+        except ImportError:
+            serve = None
+        
+        if serve is not None and not debug:
+            serve(self.app, host=host, port=port, threads=int(os.getenv('WAITRESS_THREADS', 4)))
+        else:
+            self.app.run(host=host, port=port, debug=debug, threaded=True)
 
 def create_app():
-    """Application factory"""
+    """Application factory
+
+    Multi-process: gunicorn -w $(nproc) -k sync --preload "codespace_app:create_app()"
+    """
     api = TranslationAPI()
     return api.app
 
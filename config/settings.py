@@ -11,7 +11,10 @@ class Config:
         self.secret_key = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
         self.redis_host = os.getenv('REDIS_HOST', 'localhost')
         self.redis_port = int(os.getenv('REDIS_PORT', 6379))
+        self.redis_max_connections = int(os.getenv('REDIS_MAX_CONNECTIONS', 64))
         self.model_cache_dir = os.getenv('MODEL_CACHE_DIR', './models')
+        self.translation_workers = int(os.getenv('TRANSLATION_WORKERS', 0))
+        self.translation_timeout = float(os.getenv('TRANSLATION_TIMEOUT', 120))
         self.log_level = os.getenv('LOG_LEVEL', 'INFO')
 
     def get_flask_config(self) -> Dict:
@@ -0,0 +1,21 @@
+"""
+Gunicorn configuration for the Lingua Translate API
+Usage: gunicorn -c gunicorn_conf.py
+"""
+
+import os
+
+wsgi_app = "app:create_app()"
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# Every worker loads its own NLLB-600M model and language detector (a few GB
+# each), and generate() is CPU/GPU-bound, so extra workers add memory rather
+# than throughput: keep one or two per host or GPU
+workers = int(os.getenv('WORKERS', 2))
+
+# Threads overlap Redis and client I/O with inference, and concurrent requests
+# in a worker share its batched generate() calls
+worker_class = "gthread"
+threads = int(os.getenv('THREADS', 8))
+
+timeout = int(os.getenv('TIMEOUT', 120))
@@ -0,0 +1,27 @@
+"""
+Gunicorn configuration for the main.py translation service
+Usage: gunicorn -c gunicorn_main_conf.py
+"""
+
+import os
+import multiprocessing
+
+wsgi_app = "wsgi:app"
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# Load the app once in the master and fork workers from it, so model weights
+# (PRELOAD_LANGUAGES) are shared copy-on-write instead of loaded per worker
+preload_app = True
+
+# Inference is CPU-bound; a few workers use the cores without thrashing, and
+# threaded workers keep serving dictionary hits while a request is in the model
+worker_class = "gthread"
+workers = int(os.getenv('WORKERS', min(4, multiprocessing.cpu_count())))
+# Concurrent requests in one worker also share batched model calls
+threads = int(os.getenv('THREADS', 4))
+
+# Split the cores between workers so their torch thread pools don't oversubscribe;
+# set before the app (and torch) is imported
+os.environ.setdefault('TORCH_THREADS', str(max(1, multiprocessing.cpu_count() // workers)))
+
+timeout = int(os.getenv('TIMEOUT', 120))
@@ -5,17 +5,33 @@ Enhanced Translation Engine with better multi-language support
 # Add sys import to main.py at the top
 import sys
 import os
+import logging
+import random
+import re
+import hashlib
+import contextlib
 import time
-import json
+import queue
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 
-from flask import Flask, request, jsonify, g
+from flask import Flask, Response, request, g
 from werkzeug.middleware.proxy_fix import ProxyFix
+import orjson
 import structlog
+from cachetools import LRUCache
 from prometheus_client import Counter, Histogram, generate_latest
-# Add imports for Hugging Face transformers pipeline
-from transformers import pipeline # UNCOMMENTED THIS LINE!
+
+from utils.batching import BatchCoalescer
+from utils.phrases import PhraseMatcher
+from utils.serialization import OrjsonProvider, orjson_dumps
+
+# Warnings and errors only by default, as before; LOG_LEVEL=INFO turns on the
+# per-request logs, LOG_SAMPLE_RATE thins them out under load
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'WARNING').upper(), format='%(message)s')
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', '1.0'))
 
 # Configure structured logging
 structlog.configure(
@@ -28,7 +44,7 @@ structlog.configure(
         structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
         structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer()
+        structlog.processors.JSONRenderer(serializer=orjson_dumps)
     ],
     context_class=dict,
     logger_factory=structlog.stdlib.LoggerFactory(),
@@ -40,33 +56,253 @@ logger = structlog.get_logger()
 
 # Prometheus metrics
 REQUEST_COUNT = Counter('translation_requests_total', 'Total translation requests', ['method', 'endpoint'])
-REQUEST_LATENCY = Histogram('translation_request_duration_seconds', 'Translation request latency')
+# Dictionary hits finish well under a millisecond while cold model calls take
+# seconds, so the buckets resolve both ends
+REQUEST_LATENCY = Histogram(
+    'translation_request_duration_seconds', 'Translation request latency',
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+# Helsinki-NLP opus-mt model behind each AI-backed target language
+AI_MODEL_NAMES = {
+    "es": "Helsinki-NLP/opus-mt-en-es",
+    "fr": "Helsinki-NLP/opus-mt-en-fr",
+    "it": "Helsinki-NLP/opus-mt-en-it",
+    "de": "Helsinki-NLP/opus-mt-en-de",
+    "ar": "Helsinki-NLP/opus-mt-en-ar",
+    "zh": "Helsinki-NLP/opus-mt-en-zh",
+    "ru": "Helsinki-NLP/opus-mt-en-ru",
+    "ja": "Helsinki-NLP/opus-mt-en-ja",
+    "ko": "Helsinki-NLP/opus-mt-en-ko",
+}
+
+# Directory of CTranslate2 conversions, one "en-<lang>" folder per model:
+#   ct2-transformers-converter --model Helsinki-NLP/opus-mt-en-es --output_dir models/en-es --quantization int8
+CT2_MODEL_DIR = os.getenv('CT2_MODEL_DIR', 'models')
+
+# Directory of ONNX exports for CPU-only hosts without a CTranslate2 conversion:
+#   optimum-cli export onnx --model Helsinki-NLP/opus-mt-en-es --task text2text-generation-with-past onnx_models/en-es
+ONNX_MODEL_DIR = os.getenv('ONNX_MODEL_DIR', 'onnx_models')
+
+# Full names used in the model-loading log lines
+LANGUAGE_NAMES = {
+    "es": "Spanish", "fr": "French", "it": "Italian", "de": "German", "ar": "Arabic",
+    "zh": "Chinese", "ru": "Russian", "ja": "Japanese", "ko": "Korean",
+}
+
+# Inputs that read the same in every language: URLs and bare numbers/amounts
+UNTRANSLATABLE_PATTERN = re.compile(r'(?:https?://\S+|[\d\s.,:;/+\-%]+)')
+
+# Last rendered second and its ISO-8601 string for the health endpoint
+_ts_cache = (0, "")
+
+def iso_now() -> str:
+    """Current UTC time as ISO-8601, formatted at most once per second"""
+    global _ts_cache
+    now = int(time.time())
+    if now != _ts_cache[0]:
+        _ts_cache = (now, datetime.utcfromtimestamp(now).isoformat() + "Z")
+    return _ts_cache[1]
+
+def normalize_phrase(text: str) -> str:
+    """Dictionary key form of a phrase: surrounding whitespace removed, lowercased"""
+    # Stripping first returns the same object when there is nothing to strip,
+    # so the only copy is lower()'s
+    return text.strip().lower()
+
+def json_response(data, status: int = 200) -> Response:
+    """Serialize a payload with orjson into a JSON response"""
+    return Response(orjson.dumps(data), status=status, mimetype='application/json')
 
 class SimpleRateLimiter:
-    """Simple in-memory rate limiter"""
-    def __init__(self):
-        self.requests = {}
+    """Simple in-memory fixed-window rate limiter"""
+    def __init__(self, eviction_interval: int = 10_000):
+        self.slots = {}  # client_ip -> [minute_key, count], updated in place
         self.limit = 100  # requests per minute
+        self.eviction_interval = eviction_interval
+        self.calls = 0
         
     def is_allowed(self, client_ip: str) -> bool:
-        current_time = time.time()
-        minute_key = int(current_time // 60)
+        # Only compared within this process, so a clock that never steps back is enough
+        minute_key = int(time.monotonic()) // 60
         
-        if client_ip not in self.requests:
-            self.requests[client_ip] = {}
+        self.calls += 1
+        if self.calls >= self.eviction_interval:
+            self._evict_stale(minute_key)
         
-        # Clean old entries
-        self.requests[client_ip] = {
-            k: v for k, v in self.requests[client_ip].items() 
-            if k >= minute_key - 1
-        }
+        slot = self.slots.get(client_ip)
+        if slot is None:
+            self.slots[client_ip] = [minute_key, 1]
+            return True
+        
+        if slot[0] != minute_key:
+            slot[0] = minute_key
+            slot[1] = 1
+            return True
         
-        current_count = self.requests[client_ip].get(minute_key, 0)
-        if current_count >= self.limit:
+        if slot[1] >= self.limit:
             return False
             
-        self.requests[client_ip][minute_key] = current_count + 1
+        slot[1] += 1
         return True
+    
+    def _evict_stale(self, minute_key: int):
+        """Drop clients not seen in the current or previous minute"""
+        self.calls = 0
+        self.slots = {ip: slot for ip, slot in self.slots.items() if minute_key - slot[0] <= 1}
+
+class RedisRateLimiter:
+    """Fixed-window rate limiter shared by every worker through Redis"""
+    def __init__(self, redis_client, fallback: SimpleRateLimiter):
+        self.redis_client = redis_client
+        self.fallback = fallback
+        self.limit = fallback.limit  # requests per minute
+        
+    def is_allowed(self, client_ip: str) -> bool:
+        key = f"rl:{client_ip}:{int(time.time() // 60)}"
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.incr(key)
+            pipe.expire(key, 70)
+            count, _ = pipe.execute()
+        except Exception as e:
+            logger.warning(f"Redis rate limit check failed: {e}")
+            return self.fallback.is_allowed(client_ip)
+        return count <= self.limit
+
+# Redis keys for cached responses are a fixed 24 bytes whatever the text length
+REDIS_CACHE_PREFIX = b"main:tr:"
+REDIS_CACHE_TTL = 3600
+
+# Model outputs are memoized only when inference took at least this long
+AI_CACHE_MIN_SECONDS = 0.01
+AI_CACHE_MAX_ENTRIES = 4096
+
+def redis_cache_key(cache_key: tuple) -> bytes:
+    """Hash a (source_lang, target_lang, style, text) cache key into a Redis key"""
+    return REDIS_CACHE_PREFIX + hashlib.blake2b("\x00".join(cache_key).encode('utf-8'), digest_size=16).digest()
+
+# Hard cap on generated tokens per translation
+MAX_OUTPUT_TOKENS = 256
+
+def max_output_tokens(input_tokens: int) -> int:
+    """Decode budget for an input: translations rarely run past twice the source length"""
+    return min(MAX_OUTPUT_TOKENS, 2 * input_tokens + 8)
+
+class CTranslate2Model:
+    """int8 CTranslate2 translator with the call signature of a HF translation pipeline"""
+
+    def __init__(self, model_path: str, model_name: str):
+        import ctranslate2
+        from transformers import MarianTokenizer
+
+        on_gpu = ctranslate2.get_cuda_device_count() > 0
+        self.translator = ctranslate2.Translator(
+            model_path,
+            device="cuda" if on_gpu else "cpu",
+            compute_type="int8_float16" if on_gpu else "int8",
+            inter_threads=2,
+            intra_threads=os.cpu_count() or 1
+        )
+        self.tokenizer = MarianTokenizer.from_pretrained(model_name)
+
+    def __call__(self, texts):
+        batch = [texts] if isinstance(texts, str) else list(texts)
+        tokens = [self.tokenizer.convert_ids_to_tokens(self.tokenizer.encode(text)) for text in batch]
+        results = self.translator.translate_batch(
+            tokens,
+            max_batch_size=32,
+            beam_size=1,
+            max_decoding_length=max_output_tokens(max(len(t) for t in tokens))
+        )
+        return [
+            {'translation_text': self.tokenizer.decode(
+                self.tokenizer.convert_tokens_to_ids(result.hypotheses[0]), skip_special_tokens=True
+            )}
+            for result in results
+        ]
+
+_torch_configured = False
+
+def configure_torch_threads():
+    """Pin torch's thread pools once per process, before the first model runs"""
+    global _torch_configured
+    if _torch_configured:
+        return
+    import torch
+    # Leave a core for the web server threads unless TORCH_THREADS says otherwise
+    torch.set_num_threads(int(os.getenv('TORCH_THREADS', max(1, (os.cpu_count() or 1) - 1))))
+    try:
+        torch.set_num_interop_threads(2)
+    except RuntimeError:
+        # Only allowed before any inter-op work has started
+        pass
+    _torch_configured = True
+
+class OnnxMarianModel:
+    """ONNX Runtime MarianMT export + tokenizer with the call signature of a HF translation pipeline"""
+
+    def __init__(self, model_path: str, model_name: str):
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        from transformers import MarianTokenizer
+
+        configure_torch_threads()
+        self.tokenizer = MarianTokenizer.from_pretrained(model_name)
+        self.model = ORTModelForSeq2SeqLM.from_pretrained(model_path)
+
+    def __call__(self, texts):
+        batch = [texts] if isinstance(texts, str) else list(texts)
+        encoded = self.tokenizer(batch, return_tensors="pt", padding=True, truncation=True)
+        output = self.model.generate(
+            **encoded,
+            num_beams=1,
+            do_sample=False,
+            max_new_tokens=max_output_tokens(encoded['input_ids'].shape[1])
+        )
+        return [{'translation_text': text} for text in self.tokenizer.batch_decode(output, skip_special_tokens=True)]
+
+class MarianModel:
+    """Raw MarianMT model + tokenizer with the call signature of a HF translation pipeline"""
+
+    def __init__(self, model_name: str):
+        import torch
+        from transformers import MarianMTModel, MarianTokenizer
+
+        configure_torch_threads()
+        self.torch = torch
+        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.tokenizer = MarianTokenizer.from_pretrained(model_name)
+        self.model = MarianMTModel.from_pretrained(
+            model_name, torch_dtype=self._gpu_dtype(torch)
+        ).to(self.device).eval()
+        # Each language's coalescer thread queues work on its own CUDA stream,
+        # so kernels for different languages can overlap on the GPU
+        self.stream = torch.cuda.Stream() if self.device.type == "cuda" else None
+
+    @staticmethod
+    def _gpu_dtype(torch):
+        """Half precision on tensor-core GPUs (bf16 from Ampere on), FP32 otherwise"""
+        if not torch.cuda.is_available():
+            return torch.float32
+        major, _ = torch.cuda.get_device_capability()
+        if major >= 8:
+            return torch.bfloat16
+        return torch.float16 if major >= 7 else torch.float32
+
+    def __call__(self, texts):
+        batch = [texts] if isinstance(texts, str) else list(texts)
+        stream = self.torch.cuda.stream(self.stream) if self.stream is not None else contextlib.nullcontext()
+        with stream, self.torch.inference_mode():
+            encoded = self.tokenizer(batch, return_tensors="pt", padding=True, truncation=True).to(self.device)
+            # Greedy decoding; the pipeline default is a multi-beam search. The
+            # output budget follows the input length so short phrases stop early.
+            output = self.model.generate(
+                **encoded,
+                num_beams=1,
+                do_sample=False,
+                max_new_tokens=max_output_tokens(encoded['input_ids'].shape[1])
+            ).cpu()
+        return [{'translation_text': text} for text in self.tokenizer.batch_decode(output, skip_special_tokens=True)]
 
 class EnhancedTranslationEngine:
     """Enhanced translation engine with comprehensive language support"""
@@ -74,6 +310,8 @@ class EnhancedTranslationEngine:
     def __init__(self):
         # Corrected: Only Portuguese, Turkish, and Farsi removed. Russian and others remain.
         self.supported_languages = ["en", "es", "fr", "de", "it", "ja", "ko", "zh", "ru", "ar"]
+        # O(1) membership checks for request validation
+        self.supported_language_set = frozenset(self.supported_languages)
         
         # Enhanced translation dictionaries
         self.translations = {
@@ -229,69 +467,83 @@ class EnhancedTranslationEngine:
             }
         }
         
-        # Try to load transformers, fall back to enhanced logic if not available
+        # Normalize and intern the keys once so lookups match the normalized input
+        self.translations = {
+            lang: {sys.intern(normalize_phrase(phrase)): translation for phrase, translation in phrases.items()}
+            for lang, phrases in self.translations.items()
+        }
+        
+        # One Aho-Corasick automaton per language for in-text phrase matching
+        self._phrase_matcher = PhraseMatcher(self.translations)
+        
+        # AI models load on the first dictionary miss for their language, so a
+        # dictionary-only workload never imports torch; fall back to enhanced
+        # logic if a model is not available
         self.ai_models = {}
-        # UNCOMMENTED - AI MODEL LOADING SECTION START
-        try:
-            import torch
-            # from transformers import pipeline # Already imported above
-            device = 0 if torch.cuda.is_available() else -1
-            
-            # AI models for English to Spanish, French, Italian, German, Arabic, and Chinese
-            # These are kept as you specified.
-            self.ai_models["es"] = pipeline("translation_en_to_es", model="Helsinki-NLP/opus-mt-en-es", device=device)
-            self.ai_models["fr"] = pipeline("translation_en_to_fr", model="Helsinki-NLP/opus-mt-en-fr", device=device)
-            self.ai_models["it"] = pipeline("translation_en_to_it", model="Helsinki-NLP/opus-mt-en-it", device=device)
-            
-            # Individual try-except blocks for each new language
-            try:
-                self.ai_models["de"] = pipeline("translation_en_to_de", model="Helsinki-NLP/opus-mt-en-de", device=device)
-                logger.info("AI translation model for German loaded.")
-            except Exception as e:
-                logger.warning(f"Could not load AI model for German: {e}.")
-
-            try:
-                self.ai_models["ar"] = pipeline("translation_en_to_ar", model="Helsinki-NLP/opus-mt-en-ar", device=device)
-                logger.info("AI translation model for Arabic loaded.")
-            except Exception as e:
-                logger.warning(f"Could not load AI model for Arabic: {e}.")
-
-            # Portuguese AI model removed
-            
-            try:
-                self.ai_models["zh"] = pipeline("translation_en_to_zh", model="Helsinki-NLP/opus-mt-en-zh", device=device)
-                logger.info("AI translation model for Chinese loaded.")
-            except Exception as e:
-                logger.warning(f"Could not load AI model for Chinese: {e}.")
-
-            # Corrected: Russian AI model remains
-            try:
-                self.ai_models["ru"] = pipeline("translation_en_to_ru", model="Helsinki-NLP/opus-mt-en-ru", device=device)
-                logger.info("AI translation model for Russian loaded.")
-            except Exception as e:
-                logger.warning(f"Could not load AI model for Russian: {e}.")
-
-            # Turkish AI model removed
-            # Farsi (Persian) AI model removed
-
-            # NEW: Added AI translation model for Japanese
+        # Concurrent requests for the same language share one batched model call
+        self.batchers = {}
+        self._model_locks = {lang: threading.Lock() for lang in AI_MODEL_NAMES}
+        self._unavailable_models = set()
+        # Memoized model outputs keyed by (target_lang, text)
+        self._ai_cache = LRUCache(maxsize=AI_CACHE_MAX_ENTRIES)
+        self._ai_cache_lock = threading.Lock()
+        for lang in filter(None, (code.strip() for code in os.getenv('PRELOAD_LANGUAGES', '').split(','))):
+            if lang not in AI_MODEL_NAMES:
+                logger.warning(f"PRELOAD_LANGUAGES: no AI model for '{lang}', skipping")
+                continue
+            self._ensure_model(lang)
+    
+    def _ensure_model(self, lang: str) -> Optional[BatchCoalescer]:
+        """Return the request coalescer for a language, loading its model on first use"""
+        batcher = self.batchers.get(lang)
+        if batcher is not None or lang not in self._model_locks:
+            return batcher
+        
+        with self._model_locks[lang]:
+            if lang in self.batchers or lang in self._unavailable_models:
+                return self.batchers.get(lang)
             try:
-                self.ai_models["ja"] = pipeline("translation_en_to_ja", model="Helsinki-NLP/opus-mt-en-ja", device=device)
-                logger.info("AI translation model for Japanese loaded.")
+                self.ai_models[lang] = self._load_ai_model(lang)
+                model = self.ai_models[lang]
+                # Bounded so a slow model sheds load to the dictionary instead of queuing without limit
+                self.batchers[lang] = BatchCoalescer(
+                    lambda texts, model=model: [output['translation_text'] for output in model(texts)],
+                    max_batch_size=32, max_wait=0.015, max_pending=256
+                )
+                self.clear_ai_cache(lang)
+                logger.info(f"AI translation model for {LANGUAGE_NAMES[lang]} loaded.")
             except Exception as e:
-                logger.warning(f"Could not load AI model for Japanese: {e}.")
-
-            # NEW: Added AI translation model for Korean
+                # Don't retry the load on every request
+                self._unavailable_models.add(lang)
+                logger.warning(f"Could not load AI model for {LANGUAGE_NAMES[lang]}: {e}. "
+                               "Using enhanced rule-based translation only.")
+        
+        return self.batchers.get(lang)
+    
+    def _load_ai_model(self, lang: str):
+        """
+        Load the int8 CTranslate2 model for a language, else its ONNX Runtime
+        export on CPU-only hosts, else the raw MarianMT model
+        """
+        model_name = AI_MODEL_NAMES[lang]
+        ct2_path = os.path.join(CT2_MODEL_DIR, f"en-{lang}")
+        if os.path.isdir(ct2_path):
             try:
-                self.ai_models["ko"] = pipeline("translation_en_to_ko", model="Helsinki-NLP/opus-mt-en-ko", device=device)
-                logger.info("AI translation model for Korean loaded.")
-            except Exception as e:
-                logger.warning(f"Could not load AI model for Korean: {e}.")
-
-        except Exception as e:
-            logger.warning(f"Could not load AI models: {e}. Using enhanced rule-based translation only.")
-            self.ai_models = {}
-        # UNCOMMENTED - AI MODEL LOADING SECTION END
+                return CTranslate2Model(ct2_path, model_name)
+            except ImportError:
+                logger.warning("ctranslate2 not installed - using the FP32 MarianMT model")
+        
+        # On a GPU the half-precision PyTorch model is the faster choice
+        onnx_path = os.path.join(ONNX_MODEL_DIR, f"en-{lang}")
+        if os.path.isdir(onnx_path):
+            import torch
+            if not torch.cuda.is_available():
+                try:
+                    return OnnxMarianModel(onnx_path, model_name)
+                except ImportError:
+                    logger.warning("optimum[onnxruntime] not installed - using the FP32 MarianMT model")
+        
+        return MarianModel(model_name)
     
     def get_supported_languages(self) -> List[str]:
         return self.supported_languages
@@ -302,9 +554,10 @@ class EnhancedTranslationEngine:
         Enhanced translation with a clear fallback strategy.
         1. Try to find an exact match in the hard-coded dictionary.
         2. If that fails, fall back to the AI model if available.
-        3. If both fail, return a default non-translated result.
+        3. Without a model, replace the known phrases inside the text.
+        4. If all fail, return a default non-translated result.
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
         # UNCOMMENTED - TRANSLATION LOGIC USING AI MODEL START
         try:
             # First, try a fast dictionary lookup
@@ -313,8 +566,8 @@ class EnhancedTranslationEngine:
             if dictionary_translation is not None:
                 # If a dictionary translation was found, use it immediately
                 translated_text = dictionary_translation
-                translation_time = time.time() - start_time
-                logger.info("Used dictionary translation", translation_time=translation_time)
+                translation_time = time.perf_counter() - start_time
+                logger.debug("Used dictionary translation", translation_time=translation_time)
                 return {
                     'translated_text': translated_text,
                     'detected_language': "en", # Assuming dictionary is from English
@@ -323,13 +576,32 @@ class EnhancedTranslationEngine:
                     'method': 'dictionary' # Added method key
                 }
             
+            # Skip the model for input that needs no translation
+            if self._needs_no_translation(text, source_lang, target_lang):
+                translation_time = time.perf_counter() - start_time
+                return {
+                    'translated_text': text,
+                    'detected_language': target_lang,
+                    'confidence': 1.0,
+                    'translation_time': translation_time,
+                    'method': 'passthrough'
+                }
+            
             # If no dictionary translation was found, fall back to the AI model
             # This check is what ensures only valid models are used.
-            if target_lang in self.ai_models and source_lang in ["auto", "en"]:
-                result = self.ai_models[target_lang](text)
-                translated_text = result[0]['translation_text']
-                translation_time = time.time() - start_time
-                logger.info("Used AI model translation", translation_time=translation_time)
+            batcher = self._ensure_model(target_lang) if source_lang in ["auto", "en"] else None
+            translated_text = self._ai_cache_get(target_lang, text) if batcher is not None else None
+            if batcher is not None and translated_text is None:
+                try:
+                    inference_start = time.perf_counter()
+                    translated_text = batcher.submit(text)
+                    self._ai_cache_put(target_lang, text, translated_text, time.perf_counter() - inference_start)
+                except queue.Full:
+                    # Shed load to the dictionary fallbacks rather than wait behind the backlog
+                    logger.warning("AI model queue full, using dictionary fallback", target_lang=target_lang)
+            if translated_text is not None:
+                translation_time = time.perf_counter() - start_time
+                logger.debug("Used AI model translation", translation_time=translation_time)
                 return {
                     'translated_text': translated_text,
                     'detected_language': "en", # Model translates from English
@@ -338,8 +610,21 @@ class EnhancedTranslationEngine:
                     'method': 'ai_model' # Added method key
                 }
 
+            # Without a model (or with its queue full), translate the known phrases inside the text
+            phrase_translation = self._phrase_matcher.substitute(text, target_lang)
+            if phrase_translation is not None:
+                translation_time = time.perf_counter() - start_time
+                logger.debug("Used dictionary phrase substitution", translation_time=translation_time)
+                return {
+                    'translated_text': phrase_translation,
+                    'detected_language': "en",
+                    'confidence': 0.8,
+                    'translation_time': translation_time,
+                    'method': 'dictionary_fallback'
+                }
+            
             # If both dictionary and AI model are not available, return a default response
-            translation_time = time.time() - start_time
+            translation_time = time.perf_counter() - start_time
             translated_text = f"[{target_lang.upper()}] {text}"
             logger.warning("No translation found, returning original text with placeholder", translation_time=translation_time)
             
@@ -357,32 +642,160 @@ class EnhancedTranslationEngine:
                 'translated_text': f"Translation Error: {text}",
                 'detected_language': "en",
                 'confidence': 0.0,
-                'translation_time': time.time() - start_time,
+                'translation_time': time.perf_counter() - start_time,
                 'method': 'error' # Added method key
             }
         # UNCOMMENTED - TRANSLATION LOGIC USING AI MODEL END
     
+    def translate_batch(self, texts: List[str], source_lang: str = "auto", target_lang: str = "en",
+                        style: str = "general", batch_size: int = 16) -> List[Dict[str, Any]]:
+        """
+        Translate several texts, keeping translate()'s fallback order per text.
+        Dictionary misses are sorted by length and sent to the AI model in
+        buckets of batch_size, so each call pads to a similar sequence length.
+        Results come back in the order of texts.
+        """
+        start_time = time.perf_counter()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        misses = []
+        repeats: Dict[int, List[int]] = {}  # first index of a missed text -> later copies
+        first_seen: Dict[str, int] = {}
+        for index, text in enumerate(texts):
+            dictionary_translation = self._enhanced_translate(text, target_lang) if isinstance(text, str) else None
+            if dictionary_translation is not None:
+                results[index] = {
+                    'translated_text': dictionary_translation,
+                    'detected_language': "en",
+                    'confidence': 1.0,
+                    'translation_time': time.perf_counter() - start_time,
+                    'method': 'dictionary'
+                }
+            elif isinstance(text, str) and not self._needs_no_translation(text, source_lang, target_lang):
+                # Repeated texts are translated once and copied afterwards
+                if text in first_seen:
+                    repeats[first_seen[text]].append(index)
+                else:
+                    first_seen[text] = index
+                    repeats[index] = []
+                    misses.append(index)
+            else:
+                # Passthrough and error handling match the single-text path
+                results[index] = self.translate(text, source_lang, target_lang, style)
+        
+        # Only dictionary misses justify loading the model
+        model = None
+        if misses and source_lang in ["auto", "en"] and self._ensure_model(target_lang) is not None:
+            model = self.ai_models[target_lang]
+        if model is None:
+            # Placeholder handling matches the single-text path
+            for index in misses:
+                results[index] = self.translate(texts[index], source_lang, target_lang, style)
+            return self._fill_repeats(results, repeats)
+        
+        # Texts the model has already translated skip inference
+        uncached = []
+        for index in misses:
+            translated_text = self._ai_cache_get(target_lang, texts[index])
+            if translated_text is None:
+                uncached.append(index)
+                continue
+            results[index] = {
+                'translated_text': translated_text,
+                'detected_language': "en",
+                'confidence': 0.95,
+                'translation_time': time.perf_counter() - start_time,
+                'method': 'ai_model'
+            }
+        misses = uncached
+        
+        misses.sort(key=lambda index: len(texts[index]))
+        for bucket_start in range(0, len(misses), batch_size):
+            bucket = misses[bucket_start:bucket_start + batch_size]
+            try:
+                inference_start = time.perf_counter()
+                outputs = model([texts[index] for index in bucket])
+                translated = [(output['translation_text'], 0.95, 'ai_model') for output in outputs]
+                # Charge each text its share of the bucket's inference time
+                per_text_time = (time.perf_counter() - inference_start) / len(bucket)
+                for index, (translated_text, _, _) in zip(bucket, translated):
+                    self._ai_cache_put(target_lang, texts[index], translated_text, per_text_time)
+            except Exception as e:
+                logger.error(f"Batch translation failed: {e}")
+                translated = [(f"Translation Error: {texts[index]}", 0.0, 'error') for index in bucket]
+            translation_time = time.perf_counter() - start_time
+            for index, (translated_text, confidence, method) in zip(bucket, translated):
+                results[index] = {
+                    'translated_text': translated_text,
+                    'detected_language': "en",
+                    'confidence': confidence,
+                    'translation_time': translation_time,
+                    'method': method
+                }
+        
+        return self._fill_repeats(results, repeats)
+    
+    @staticmethod
+    def _fill_repeats(results: List[Optional[Dict[str, Any]]],
+                      repeats: Dict[int, List[int]]) -> List[Optional[Dict[str, Any]]]:
+        """Copy each translated text's result to its repeated positions"""
+        for index, copies in repeats.items():
+            for copy_index in copies:
+                results[copy_index] = results[index]
+        return results
+    
+    def _ai_cache_get(self, target_lang: str, text: str) -> Optional[str]:
+        """Return a memoized model output, or None"""
+        with self._ai_cache_lock:
+            return self._ai_cache.get((target_lang, text))
+    
+    def _ai_cache_put(self, target_lang: str, text: str, translated_text: str, elapsed: float):
+        """Memoize a model output unless it was too cheap to be worth the memory"""
+        if elapsed < AI_CACHE_MIN_SECONDS:
+            return
+        with self._ai_cache_lock:
+            self._ai_cache[(target_lang, text)] = translated_text
+    
+    def clear_ai_cache(self, target_lang: Optional[str] = None):
+        """Forget memoized model outputs for one language, or for all of them"""
+        with self._ai_cache_lock:
+            if target_lang is None:
+                self._ai_cache.clear()
+                return
+            for key in [key for key in self._ai_cache if key[0] == target_lang]:
+                del self._ai_cache[key]
+    
+    def _needs_no_translation(self, text: str, source_lang: str, target_lang: str) -> bool:
+        """True for blank input, lone symbols, URLs, numbers and English into English"""
+        stripped = text.strip()
+        if not stripped or (len(stripped) < 2 and not stripped.isalpha()):
+            return True
+        # ASCII text is only known to be English when the caller says so; 'auto' may be any language
+        if source_lang == "en" and target_lang == "en" and text.isascii() and text.isprintable():
+            return True
+        return UNTRANSLATABLE_PATTERN.fullmatch(stripped) is not None
+    
     def _enhanced_translate(self, text: str, target_lang: str) -> Optional[str]:
         """
         Performs a simple, exact-match dictionary lookup.
         Returns the translated string if a match is found, otherwise returns None.
         """
-        if target_lang not in self.translations:
+        lang_dict = self.translations.get(target_lang)
+        if lang_dict is None:
             return None
         
-        text_lower = text.lower().strip()
-        lang_dict = self.translations[target_lang]
+        # Keys are normalized, so already-normalized input matches without a copy
+        translation = lang_dict.get(text)
+        if translation is not None:
+            return translation
         
         # Only perform a direct phrase match, as this is fast and accurate
-        if text_lower in lang_dict:
-            return lang_dict[text_lower]
-        
         # If no match is found, return None to indicate failure
-        return None
+        return lang_dict.get(normalize_phrase(text))
 
 class TranslationAPI:
     def __init__(self):
         self.app = Flask(__name__)
+        self.app.json = OrjsonProvider(self.app)
         self.app.wsgi_app = ProxyFix(self.app.wsgi_app, x_for=1, x_proto=1, x_host=1, x_prefix=1)
         
         # Initialize components
@@ -394,38 +807,163 @@ class TranslationAPI:
         """Initialize core components with error handling"""
         try:
             self.translator = EnhancedTranslationEngine()
+            self.redis_client = self._setup_redis()
             self.rate_limiter = SimpleRateLimiter()
-            self.cache = {}  # Simple in-memory cache
+            if self.redis_client is not None:
+                # One limit across all gunicorn workers
+                self.rate_limiter = RedisRateLimiter(self.redis_client, self.rate_limiter)
+            self.cache = OrderedDict()  # Bounded in-memory LRU cache in front of Redis
+            # Entry cap; responses echo texts of up to 5000 characters, so this bounds memory
+            self.cache_max = int(os.getenv('CACHE_MAX_ENTRIES', 10_000))
+            self.cache_lock = threading.Lock()
             logger.info("All components initialized successfully")
         except Exception as e:
             logger.error(f"Component initialization failed: {e}")
             raise
 
+    def _setup_redis(self):
+        """Connect to Redis when REDIS_HOST is set; None keeps everything in-process"""
+        redis_host = os.getenv('REDIS_HOST')
+        if not redis_host:
+            return None
+        try:
+            import redis
+            client = redis.Redis(
+                host=redis_host,
+                port=int(os.getenv('REDIS_PORT', 6379)),
+                socket_connect_timeout=2,
+                socket_timeout=2
+            )
+            client.ping()
+            logger.info("Redis connection established", host=redis_host)
+            return client
+        except Exception as e:
+            logger.warning(f"Redis unavailable: {e}")
+            return None
+
+    def _cache_get(self, key):
+        """Return a cached response, checking this worker's LRU first and then Redis"""
+        with self.cache_lock:
+            value = self.cache.get(key)
+            if value is not None:
+                self.cache.move_to_end(key)
+                return value
+        
+        if self.redis_client is None:
+            return None
+        try:
+            cached_data = self.redis_client.get(redis_cache_key(key))
+        except Exception as e:
+            logger.warning(f"Redis cache read failed: {e}")
+            return None
+        if cached_data is None:
+            return None
+        value = orjson.loads(cached_data)
+        self._cache_put(key, value, shared=False)
+        return value
+
+    def _cache_put(self, key, value, shared: bool = True):
+        """Store a response, evicting the least recently used one beyond cache_max"""
+        with self.cache_lock:
+            self.cache[key] = value
+            self.cache.move_to_end(key)
+            if len(self.cache) > self.cache_max:
+                self.cache.popitem(last=False)
+        
+        if shared and self.redis_client is not None:
+            try:
+                self.redis_client.setex(redis_cache_key(key), REDIS_CACHE_TTL, orjson.dumps(value))
+            except Exception as e:
+                logger.warning(f"Redis cache write failed: {e}")
+
+    def _cache_get_many(self, keys: List[Optional[tuple]]) -> List[Optional[Dict]]:
+        """Look keys up in this worker's LRU, then fetch the rest from Redis in one MGET; None keys are skipped"""
+        values = [None] * len(keys)
+        with self.cache_lock:
+            for index, key in enumerate(keys):
+                if key is None:
+                    continue
+                value = self.cache.get(key)
+                if value is not None:
+                    self.cache.move_to_end(key)
+                    values[index] = value
+        
+        remote_indices = [index for index, key in enumerate(keys) if key is not None and values[index] is None]
+        if self.redis_client is None or not remote_indices:
+            return values
+        try:
+            cached_items = self.redis_client.mget([redis_cache_key(keys[index]) for index in remote_indices])
+        except Exception as e:
+            logger.warning(f"Redis cache read failed: {e}")
+            return values
+        for index, cached_data in zip(remote_indices, cached_items):
+            if cached_data is not None:
+                values[index] = orjson.loads(cached_data)
+                self._cache_put(keys[index], values[index], shared=False)
+        return values
+
+    def _cache_put_many(self, items: Dict[tuple, Dict]):
+        """Store several responses, writing them to Redis in one pipeline"""
+        for key, value in items.items():
+            self._cache_put(key, value, shared=False)
+        
+        if not items or self.redis_client is None:
+            return
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key, value in items.items():
+                pipe.setex(redis_cache_key(key), REDIS_CACHE_TTL, orjson.dumps(value))
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Redis cache write failed: {e}")
+
+    def _build_response_data(self, text: str, translation_result: Dict, source_lang: str,
+                             target_lang: str, style: str) -> Dict:
+        """Shape an engine result as the /translate response payload"""
+        return {
+            'original_text': text,
+            'translated_text': translation_result['translated_text'],
+            'source_language': translation_result.get('detected_language', source_lang),
+            'target_language': target_lang,
+            'style': style,
+            'confidence_score': translation_result.get('confidence', 0.95),
+            'translation_time': round(translation_result['translation_time'], 3),
+            'cached': False,
+            'method': translation_result.get('method', 'unknown') # Added method key for consistency
+        }
+
     def _setup_middleware(self):
         """Setup request middleware"""
         @self.app.before_request
         def before_request():
-            g.start_time = time.time()
+            g.start_time = time.perf_counter()
             REQUEST_COUNT.labels(method=request.method, endpoint=request.endpoint or 'unknown').inc()
 
         @self.app.after_request
         def after_request(response):
             if hasattr(g, 'start_time'):
-                REQUEST_LATENCY.observe(time.time() - g.start_time)
+                REQUEST_LATENCY.observe(time.perf_counter() - g.start_time)
             return response
 
     def _setup_routes(self):
         """Setup API routes"""
+        # Static payloads are serialized once; '/' rebuilds its body once a second
+        self._languages_body = orjson.dumps({
+            'supported_languages': self.translator.get_supported_languages(),
+            'total_count': len(self.translator.get_supported_languages())
+        })
+        self._health_body_prefix = b'{"status":"healthy","service":"lingua-translate","version":"2.1.0","timestamp":"'
+        self._health_body = (0, b'')  # (second, full body) so probes within a second reuse the bytes
         
         @self.app.route('/')
         def health_check():
             """Health check endpoint"""
-            return jsonify({
-                'status': 'healthy',
-                'service': 'lingua-translate',
-                'version': '2.1.0',
-                'timestamp': datetime.utcnow().isoformat()
-            })
+            now = int(time.time())
+            second, body = self._health_body
+            if second != now:
+                body = self._health_body_prefix + iso_now().encode() + b'"}'
+                self._health_body = (now, body)
+            return Response(body, mimetype='application/json')
 
         @self.app.route('/metrics')
         def metrics():
@@ -440,10 +978,7 @@ class TranslationAPI:
         @self.app.route('/languages', methods=['GET'])
         def get_languages():
             """Get supported languages"""
-            return jsonify({
-                'supported_languages': self.translator.get_supported_languages(),
-                'total_count': len(self.translator.get_supported_languages())
-            })
+            return Response(self._languages_body, mimetype='application/json')
 
         @self.app.route('/batch-translate', methods=['POST'])
         def batch_translate():
@@ -456,102 +991,110 @@ class TranslationAPI:
             # Rate limiting
             client_ip = request.environ.get('HTTP_X_FORWARDED_FOR', request.remote_addr)
             if not self.rate_limiter.is_allowed(client_ip):
-                return jsonify({'error': 'Rate limit exceeded'}), 429
+                return json_response({'error': 'Rate limit exceeded'}, 429)
 
             # Validate request
             if not request.is_json:
-                return jsonify({'error': 'Content-Type must be JSON'}), 400
+                return json_response({'error': 'Content-Type must be JSON'}, 400)
 
             data = request.get_json()
             validation_error = self._validate_translate_request(data)
             if validation_error:
-                return jsonify({'error': validation_error}), 400
+                return json_response({'error': validation_error}, 400)
 
-            # Extract parameters with defaults
+            # Extract parameters with defaults; the short codes repeat across
+            # requests, so interning them makes cache-key comparisons identity checks
             text = data['text']
-            source_lang = data.get('source_lang', 'auto')
-            target_lang = data.get('target_lang', 'en')
-            style = data.get('style', 'general')
+            source_lang = sys.intern(data.get('source_lang', 'auto'))
+            target_lang = sys.intern(data.get('target_lang', 'en'))
+            style = sys.intern(data.get('style', 'general'))
 
-            # Check cache
-            cache_key = f"translate:{source_lang}:{target_lang}:{style}:{hash(text)}"
-            if cache_key in self.cache:
-                logger.info("Cache hit", cache_key=cache_key)
-                response_data = self.cache[cache_key].copy()
-                response_data['cached'] = True
-                return jsonify(response_data)
+            # Check cache; the full tuple is the key, so different texts never collide
+            cache_key = (source_lang, target_lang, style, text)
+            cached_response = self._cache_get(cache_key)
+            if cached_response is not None:
+                if random.random() < LOG_SAMPLE_RATE:
+                    logger.info("Cache hit", source_lang=source_lang, target_lang=target_lang)
+                return json_response(cached_response)
 
-            # Perform translation
-            start_time = time.time()
+            # Perform translation; the engine times itself
             translation_result = self.translator.translate(
                 text=text,
                 source_lang=source_lang,
                 target_lang=target_lang,
                 style=style
             )
-            translation_time = time.time() - start_time
+            translation_time = translation_result['translation_time']
 
             # Prepare response
-            response_data = {
-                'original_text': text,
-                'translated_text': translation_result['translated_text'],
-                'source_language': translation_result.get('detected_language', source_lang),
-                'target_language': target_lang,
-                'style': style,
-                'confidence_score': translation_result.get('confidence', 0.95),
-                'translation_time': round(translation_time, 3),
-                'cached': False,
-                'method': translation_result.get('method', 'unknown') # Added method key for consistency
-            }
+            response_data = self._build_response_data(text, translation_result, source_lang, target_lang, style)
 
-            # Cache result
-            try:
-                self.cache[cache_key] = response_data.copy()
-            except Exception as e:
-                logger.warning(f"Failed to cache result: {e}")
+            # Cache result with the hit flag already set; cached dicts are never mutated
+            self._cache_put(cache_key, {**response_data, 'cached': True})
 
-            logger.info("Translation completed", 
-                                source_lang=source_lang, 
-                                target_lang=target_lang,
-                                translation_time=translation_time)
+            if random.random() < LOG_SAMPLE_RATE:
+                logger.info("Translation completed", 
+                                    source_lang=source_lang, 
+                                    target_lang=target_lang,
+                                    translation_time=translation_time)
             
-            return jsonify(response_data)
+            return json_response(response_data)
 
         except Exception as e:
             logger.error(f"Translation error: {e}")
-            return jsonify({'error': 'Internal server error'}), 500
+            return json_response({'error': 'Internal server error'}, 500)
 
     def _handle_batch_translate(self):
         """Handle batch translation requests"""
         try:
             data = request.get_json()
             if not data or 'texts' not in data:
-                return jsonify({'error': 'Missing texts array'}), 400
+                return json_response({'error': 'Missing texts array'}, 400)
 
             texts = data['texts']
             if len(texts) > 100:
-                return jsonify({'error': 'Maximum 100 texts per batch'}), 400
+                return json_response({'error': 'Maximum 100 texts per batch'}, 400)
 
             source_lang = data.get('source_lang', 'auto')
             target_lang = data.get('target_lang', 'en')
             style = data.get('style', 'general')
 
-            results = []
-            for text in texts:
-                result = self.translator.translate(
-                    text=text,
+            # Same keys as /translate, so either endpoint reuses the other's results
+            cache_keys = [
+                (source_lang, target_lang, style, text) if isinstance(text, str) else None
+                for text in texts
+            ]
+            responses = self._cache_get_many(cache_keys)
+
+            # Only the cache misses reach the engine
+            miss_indices = [index for index, response in enumerate(responses) if response is None]
+            if miss_indices:
+                translations = self.translator.translate_batch(
+                    texts=[texts[index] for index in miss_indices],
                     source_lang=source_lang,
                     target_lang=target_lang,
                     style=style
                 )
-                results.append({
+                fresh = {}
+                for index, translation_result in zip(miss_indices, translations):
+                    responses[index] = self._build_response_data(
+                        texts[index], translation_result, source_lang, target_lang, style
+                    )
+                    if cache_keys[index] is not None and responses[index]['method'] != 'error':
+                        fresh[cache_keys[index]] = {**responses[index], 'cached': True}
+                self._cache_put_many(fresh)
+
+            results = [
+                {
                     'original': text,
-                    'translated': result['translated_text'],
-                    'confidence': result.get('confidence', 0.95),
-                    'method': result.get('method', 'unknown') # Added method key for consistency
-                })
+                    'translated': response['translated_text'],
+                    'confidence': response['confidence_score'],
+                    'method': response['method']
+                }
+                for text, response in zip(texts, responses)
+            ]
 
-            return jsonify({
+            return json_response({
                 'results': results,
                 'total_count': len(results),
                 'source_language': source_lang,
@@ -560,7 +1103,7 @@ class TranslationAPI:
 
         except Exception as e:
             logger.error(f"Batch translation error: {e}")
-            return jsonify({'error': 'Internal server error'}), 500
+            return json_response({'error': 'Internal server error'}, 500)
 
     def _validate_translate_request(self, data: Dict) -> Optional[str]:
         """Validate translation request data"""
@@ -576,8 +1119,12 @@ class TranslationAPI:
         if len(data['text']) > 5000:
             return 'Text too long (max 5000 characters)'
         
+        for field in ('source_lang', 'target_lang', 'style'):
+            if field in data and not isinstance(data[field], str):
+                return f'{field} must be a string'
+        
         target_lang = data.get('target_lang')
-        if target_lang and target_lang not in self.translator.get_supported_languages():
+        if target_lang and target_lang not in self.translator.supported_language_set:
             return f'Unsupported target language: {target_lang}'
         
         return None
@@ -602,7 +1149,9 @@ if __name__ == '__main__':
         print("TranslationAPI initialized successfully")
         print(f"Supported languages: {api.translator.get_supported_languages()}")
         print(f"AI models loaded: {list(api.translator.ai_models.keys())}")
-        api.run(host='0.0.0.0', port=5000, debug=False)  # Set debug=False for production
+        print("Flask's development server handles one request at a time; "
+              "for production run: gunicorn -c gunicorn_main_conf.py")
+        api.run(host='0.0.0.0', port=5000, debug=False)
     except Exception as e:
         print(f"Failed to start application: {e}")
         import traceback
@@ -0,0 +1,92 @@
+"""
+Shared helpers for the test suite
+"""
+
+import importlib
+import sys
+
+from prometheus_client import REGISTRY
+from prometheus_client.metrics import MetricWrapperBase
+
+# The Flask entry points register the same metric names in the default registry
+_ENTRY_POINTS = ("main", "app", "codespace_app")
+
+
+def import_entry_point(name: str):
+    """Import one Flask entry point, first unregistering the others' Prometheus metrics"""
+    for other in _ENTRY_POINTS:
+        module = sys.modules.get(other)
+        if other == name or module is None:
+            continue
+        for value in vars(module).values():
+            if isinstance(value, MetricWrapperBase):
+                try:
+                    REGISTRY.unregister(value)
+                except KeyError:
+                    pass
+    return importlib.import_module(name)
+
+
+class FakeRedis:
+    """The handful of Redis commands the tests exercise, held in a dict"""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+    def expire(self, key, seconds):
+        self.ttls[key] = seconds
+        return True
+
+    def get(self, key):
+        value = self.data.get(key)
+        return None if value is None else str(value).encode()
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def setex(self, key, seconds, value):
+        self.data[key] = value
+        self.ttls[key] = seconds
+        return True
+
+    def rpush(self, key, value):
+        self.data.setdefault(key, []).append(value)
+        return len(self.data[key])
+
+    def ltrim(self, key, start, end):
+        items = self.data.get(key, [])
+        self.data[key] = items[start:len(items) if end == -1 else end + 1]
+        return True
+
+    def lrange(self, key, start, end):
+        items = self.data.get(key, [])
+        return items[start:len(items) if end == -1 else end + 1]
+
+
+class _FakePipeline:
+    """Queues FakeRedis calls until execute()"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        command = getattr(self.redis, name)
+
+        def queue(*args):
+            self.commands.append((command, args))
+            return self
+        return queue
+
+    def execute(self):
+        results = [command(*args) for command, args in self.commands]
+        self.commands = []
+        return results
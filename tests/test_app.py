@@ -0,0 +1,155 @@
+"""
+Smoke tests for app.py's wiring to the top-level AdvancedTranslationEngine
+"""
+
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+import translation_engine  # noqa: E402
+from cachetools import LRUCache  # noqa: E402
+
+from tests.helpers import import_entry_point  # noqa: E402
+
+app = import_entry_point("app")
+
+
+class _StubBatcher:
+    """Answers for the inference worker without a model"""
+
+    def submit(self, input_text, target_lang, num_beams=1, context="", timeout=120.0):
+        return f"{target_lang}:{input_text}", 0.9
+
+    def submit_async(self, input_text, target_lang, num_beams=1, context=""):
+        future = Future()
+        future.set_result(self.submit(input_text, target_lang, num_beams, context))
+        return future
+
+
+class _WeightlessEngine(translation_engine.AdvancedTranslationEngine):
+    """The real engine API with the model loading and inference stubbed out"""
+
+    def __init__(self):
+        self.device = "cpu"
+        self.model_name = "facebook/nllb-200-distilled-600M"
+        self.backend = "transformers"
+        self.compiled = False
+        self.cache_enabled = True
+        self._detect_cache = LRUCache(maxsize=16)
+        self._translation_cache = LRUCache(maxsize=16)
+        self._cache_lock = threading.Lock()
+        self.tokenizer = lambda *args, **kwargs: None
+        self.batcher = _StubBatcher()
+
+
+def _no_redis(api):
+    api.redis_pool = None
+    api.redis_client = None
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(app, "AdvancedTranslationEngine", _WeightlessEngine)
+    monkeypatch.setattr(app.TranslationAPI, "_setup_redis", _no_redis)
+    return app.create_app().test_client()
+
+
+def test_app_serves_the_top_level_engine():
+    assert app.AdvancedTranslationEngine is translation_engine.AdvancedTranslationEngine
+
+
+def test_translate_goes_through_the_engine(client):
+    response = client.post("/translate", json={"text": "Good evening", "source_lang": "en",
+                                               "target_lang": "es", "use_context": False})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["translated_text"] == "es:eng_Latn Good evening"
+    assert body["confidence_score"] == 0.9
+
+
+def test_batch_translate_goes_through_the_engine(client):
+    response = client.post("/batch-translate", json={"texts": ["one", "two", "one"],
+                                                     "source_lang": "en", "target_lang": "fr"})
+
+    assert response.status_code == 200
+    translated = [item["translated"] for item in response.get_json()["results"]]
+    assert translated == ["fr:eng_Latn one", "fr:eng_Latn two", "fr:eng_Latn one"]
+
+
+def test_batch_translate_sends_each_distinct_text_once(client, monkeypatch):
+    submitted = []
+    submit = _StubBatcher.submit
+
+    def counting_submit(self, input_text, *args, **kwargs):
+        submitted.append(input_text)
+        return submit(self, input_text, *args, **kwargs)
+
+    monkeypatch.setattr(_StubBatcher, "submit", counting_submit)
+    response = client.post("/batch-translate", json={"texts": ["b", "a", "b", "c", "a"],
+                                                     "source_lang": "en", "target_lang": "fr"})
+
+    translated = [item["translated"] for item in response.get_json()["results"]]
+    assert translated == ["fr:eng_Latn b", "fr:eng_Latn a", "fr:eng_Latn b", "fr:eng_Latn c", "fr:eng_Latn a"]
+    assert sorted(submitted) == ["eng_Latn a", "eng_Latn b", "eng_Latn c"]
+
+
+def test_translation_cache_key_is_stable_and_fixed_size():
+    key = app.translation_cache_key("en", "es", "general", "hello")
+
+    assert key == b"tr:" + bytes.fromhex("141bc35869795eb842934369dc3cced2")
+    assert len(app.translation_cache_key("en", "es", "general", "x" * 5000)) == 19
+    assert key != app.translation_cache_key("en", "es", "general a", "hello")
+
+
+def test_one_failed_text_does_not_fail_the_batch(client, monkeypatch):
+    submit_async = _StubBatcher.submit_async
+
+    def failing_submit_async(self, input_text, *args, **kwargs):
+        if input_text.endswith("bad"):
+            future = Future()
+            future.set_exception(RuntimeError("inference failed"))
+            return future
+        return submit_async(self, input_text, *args, **kwargs)
+
+    monkeypatch.setattr(_StubBatcher, "submit_async", failing_submit_async)
+    response = client.post("/batch-translate", json={"texts": ["good", "bad", "fine"],
+                                                     "source_lang": "en", "target_lang": "fr"})
+
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert [item["translated"] for item in results] == ["fr:eng_Latn good", "bad", "fr:eng_Latn fine"]
+    assert results[1]["confidence"] == 0.0
+
+
+class _ParentlessEngine(translation_engine.AdvancedTranslationEngine):
+    """Fails if the API process builds its own engine"""
+
+    def __init__(self):
+        raise AssertionError("the API process loaded a model")
+
+
+class _StubPool:
+    def __init__(self, max_workers, mp_context=None, initializer=None):
+        self.max_workers = max_workers
+
+    def shutdown(self, wait=True):
+        pass
+
+
+def test_process_pool_mode_loads_no_model_in_the_api_process(monkeypatch):
+    monkeypatch.setenv("TRANSLATION_WORKERS", "2")
+    monkeypatch.setattr(app, "AdvancedTranslationEngine", _ParentlessEngine)
+    monkeypatch.setattr(app, "ProcessPoolExecutor", _StubPool)
+    monkeypatch.setattr(app.torch.cuda, "is_available", lambda: False)
+    monkeypatch.setattr(app.TranslationAPI, "_setup_redis", _no_redis)
+
+    api = app.TranslationAPI()
+
+    assert api.translator is None
+    assert api.cpu_pool.max_workers == 2
+    assert api.supported_languages == tuple(translation_engine.AdvancedTranslationEngine.SUPPORTED_LANGUAGES)
@@ -0,0 +1,75 @@
+"""
+Tests for utils.batching.BatchCoalescer
+"""
+
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+from utils.batching import BatchCoalescer
+
+
+def test_concurrent_submits_share_one_model_call():
+    calls = []
+
+    def model(texts):
+        calls.append(list(texts))
+        return [text.upper() for text in texts]
+
+    coalescer = BatchCoalescer(model, max_batch_size=8, max_wait=0.2)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(coalescer.submit, ["a", "b", "c", "d"]))
+
+    assert results == ["A", "B", "C", "D"]
+    assert len(calls) == 1
+    assert sorted(calls[0]) == ["a", "b", "c", "d"]
+
+
+def test_model_errors_reach_every_caller():
+    def model(texts):
+        raise RuntimeError("model failed")
+
+    coalescer = BatchCoalescer(model, max_wait=0)
+
+    with pytest.raises(RuntimeError, match="model failed"):
+        coalescer.submit("a", timeout=5)
+
+
+def test_bounded_queue_sheds_load():
+    started = threading.Event()
+    release = threading.Event()
+
+    def model(texts):
+        started.set()
+        release.wait(5)
+        return texts
+
+    coalescer = BatchCoalescer(model, max_batch_size=1, max_wait=0, max_pending=1)
+    # One item in the model, one waiting in the queue
+    first = threading.Thread(target=coalescer.submit, args=("a",))
+    first.start()
+    assert started.wait(5)
+    coalescer.pending.put_nowait(("b", Future()))
+
+    try:
+        with pytest.raises(queue.Full):
+            coalescer.submit("c")
+    finally:
+        release.set()
+        first.join(5)
+
+
+def test_short_model_output_fails_every_caller_instead_of_hanging():
+    coalescer = BatchCoalescer(lambda texts: texts[:-1], max_batch_size=4, max_wait=0.2)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = [pool.submit(coalescer.submit, text, 5) for text in ("a", "b")]
+        for future in futures:
+            with pytest.raises(RuntimeError, match="translations for"):
+                future.result(timeout=10)
+
+    # The worker survives to serve the next batch
+    coalescer.model = lambda texts: texts
+    assert coalescer.submit("c", timeout=5) == "c"
@@ -0,0 +1,32 @@
+"""
+Tests for main.py's Redis response cache keys
+"""
+
+from tests.helpers import import_entry_point
+
+main = import_entry_point("main")
+
+
+def test_key_is_stable_across_processes():
+    # A pinned digest: the key must not depend on hash() randomization or the Python version
+    key = main.redis_cache_key(("en", "es", "general", "hello"))
+
+    assert key == main.REDIS_CACHE_PREFIX + bytes.fromhex("141bc35869795eb842934369dc3cced2")
+
+
+def test_key_has_a_fixed_size_whatever_the_text_length():
+    assert len(main.redis_cache_key(("en", "es", "general", "x" * 5000))) == 24
+
+
+def test_every_field_changes_the_key():
+    base = ("en", "es", "general", "hello")
+    variants = [("fr", "es", "general", "hello"), ("en", "de", "general", "hello"),
+                ("en", "es", "formal", "hello"), ("en", "es", "general", "Hello")]
+
+    keys = {main.redis_cache_key(base)} | {main.redis_cache_key(variant) for variant in variants}
+    assert len(keys) == 5
+
+
+def test_fields_cannot_run_into_each_other():
+    assert main.redis_cache_key(("en", "es", "general", "a b")) != main.redis_cache_key(("en", "es", "general a", "b"))
+    assert main.redis_cache_key(("en", "es", "ab", "c")) != main.redis_cache_key(("en", "es", "a", "bc"))
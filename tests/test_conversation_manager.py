@@ -0,0 +1,62 @@
+"""
+Tests for utils.conversation_manager.ConversationManager
+"""
+
+import msgpack
+import pytest
+
+from tests.helpers import FakeRedis
+from utils.conversation_manager import ConversationManager, conversation_key
+
+
+@pytest.fixture(params=["memory", "redis"])
+def manager(request):
+    redis_client = FakeRedis() if request.param == "redis" else None
+    return ConversationManager(redis_client=redis_client, max_history=4)
+
+
+def test_context_uses_the_last_three_exchanges_in_order(manager):
+    for n in range(5):
+        manager.add_exchange("s1", f"u{n}", f"t{n}")
+
+    assert manager.get_context("s1") == "Previous: u2 -> t2 | Previous: u3 -> t3 | Previous: u4 -> t4"
+    assert manager.get_context("other") == ""
+
+
+def test_history_is_capped_at_max_history(manager):
+    for n in range(6):
+        manager.add_exchange("s1", f"u{n}", f"t{n}")
+
+    assert [exchange['user_text'] for exchange in manager._get_history("s1")] == ["u2", "u3", "u4", "u5"]
+
+
+def test_redis_history_is_a_msgpack_list_under_the_versioned_key():
+    redis_client = FakeRedis()
+    manager = ConversationManager(redis_client=redis_client)
+
+    manager.add_exchange("s1", "hello", "hola")
+
+    assert conversation_key("s1") == "conversation:v2:s1"
+    assert "conversation:s1" not in redis_client.data
+    [raw] = redis_client.data[conversation_key("s1")]
+    assert msgpack.unpackb(raw)['translation'] == "hola"
+    assert redis_client.ttls[conversation_key("s1")] == 3600
+
+
+def test_queued_pipeline_read_decodes_with_context_from_raw():
+    redis_client = FakeRedis()
+    manager = ConversationManager(redis_client=redis_client)
+    pipe = redis_client.pipeline(transaction=False)
+    manager.add_exchange("s1", "hello", "hola", pipe=pipe)
+    manager.queue_context(pipe, "s1")
+
+    *_, raw_exchanges = pipe.execute()
+
+    assert manager.context_from_raw(raw_exchanges) == "Previous: hello -> hola"
+
+
+def test_undecodable_context_is_empty():
+    manager = ConversationManager(redis_client=FakeRedis())
+
+    assert manager.context_from_raw(None) == ""
+    assert manager.context_from_raw([b"\xc1"]) == ""
@@ -0,0 +1,68 @@
+"""
+Tests for main.py's response cache on the /batch-translate path
+"""
+
+import pytest
+
+from tests.helpers import FakeRedis, import_entry_point
+
+main = import_entry_point("main")
+
+BATCH = {"texts": ["hello", "good night", "hello"], "source_lang": "fr", "target_lang": "es"}
+
+
+@pytest.fixture
+def redis_client():
+    return FakeRedis()
+
+
+@pytest.fixture
+def make_api(monkeypatch, redis_client):
+    monkeypatch.delenv('PRELOAD_LANGUAGES', raising=False)
+    monkeypatch.setattr(main.TranslationAPI, "_setup_redis", lambda api: redis_client)
+
+    def make_api():
+        api = main.TranslationAPI()
+        api.engine_calls = []
+        translate_batch = api.translator.translate_batch
+
+        def counting_translate_batch(texts, **kwargs):
+            api.engine_calls.append(list(texts))
+            return translate_batch(texts, **kwargs)
+
+        monkeypatch.setattr(api.translator, "translate_batch", counting_translate_batch)
+        return api
+    return make_api
+
+
+def _translated(api, payload=BATCH):
+    response = api.app.test_client().post("/batch-translate", json=payload)
+    assert response.status_code == 200
+    return [item["translated"] for item in response.get_json()["results"]]
+
+
+def test_repeated_batch_is_served_from_the_worker_cache(make_api):
+    api = make_api()
+
+    first = _translated(api)
+    assert _translated(api) == first == ["hola", "[ES] good night", "hola"]
+    assert api.engine_calls == [["hello", "good night", "hello"]]
+
+
+def test_batch_reads_what_another_worker_wrote_to_redis(make_api, redis_client):
+    _translated(make_api())
+    assert len(redis_client.data) == 2
+
+    other_worker = make_api()
+    assert _translated(other_worker) == ["hola", "[ES] good night", "hola"]
+    assert other_worker.engine_calls == []
+
+
+def test_batch_and_single_translate_share_cache_entries(make_api):
+    api = make_api()
+    single = api.app.test_client().post("/translate", json={"text": "good night", "source_lang": "fr",
+                                                            "target_lang": "es"})
+    assert single.status_code == 200
+
+    _translated(api)
+    assert api.engine_calls == [["hello", "hello"]]
@@ -0,0 +1,98 @@
+"""
+Tests for main.py's EnhancedTranslationEngine that run without model weights
+"""
+
+import pytest
+
+from tests.helpers import import_entry_point
+
+main = import_entry_point("main")
+
+
+class _StubIds:
+    """Stands in for a (batch, tokens) id tensor"""
+
+    def __init__(self, rows, tokens):
+        self.shape = (rows, tokens)
+
+
+class _StubTokenizer:
+    def __call__(self, texts, **kwargs):
+        return {'input_ids': _StubIds(len(texts), max(len(text.split()) for text in texts))}
+
+    def batch_decode(self, outputs, skip_special_tokens=True):
+        return [f"<es> {text}" for text in outputs]
+
+
+class _StubGenerator:
+    def __init__(self):
+        self.calls = []
+
+    def generate(self, input_ids, **kwargs):
+        self.calls.append(kwargs)
+        return [f"row {row}" for row in range(input_ids.shape[0])]
+
+
+def _stub_onnx_model():
+    """An OnnxMarianModel wired to a stub tokenizer and model instead of an export on disk"""
+    model = object.__new__(main.OnnxMarianModel)
+    model.tokenizer = _StubTokenizer()
+    model.model = _StubGenerator()
+    return model
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.delenv('PRELOAD_LANGUAGES', raising=False)
+    engine = main.EnhancedTranslationEngine()
+    model = _stub_onnx_model()
+    monkeypatch.setattr(engine, '_load_ai_model', lambda lang: model)
+    return engine
+
+
+def test_max_output_tokens_scales_with_input_and_is_capped():
+    assert main.max_output_tokens(4) == 16
+    assert main.max_output_tokens(10_000) == main.MAX_OUTPUT_TOKENS
+
+
+def test_translate_runs_the_ai_model(engine):
+    result = engine.translate("The weather is lovely today", target_lang="es")
+
+    assert result['method'] == 'ai_model'
+    assert result['translated_text'] == "<es> row 0"
+    model = engine.ai_models['es']
+    assert model.model.calls == [
+        {'num_beams': 1, 'do_sample': False, 'max_new_tokens': main.max_output_tokens(5)}
+    ]
+
+
+def test_translate_batch_runs_the_ai_model(engine):
+    texts = ["The weather is lovely today", "hello", "The weather is lovely today"]
+
+    results = engine.translate_batch(texts, target_lang="es")
+
+    assert [result['method'] for result in results] == ['ai_model', 'dictionary', 'ai_model']
+    assert results[1]['translated_text'] == "hola"
+    assert results[0]['translated_text'] == results[2]['translated_text'] == "<es> row 0"
+    # The repeated text is translated once
+    assert len(engine.ai_models['es'].model.calls) == 1
+
+
+def test_translate_batch_keeps_input_order_around_dictionary_hits(engine):
+    texts = ["first sentence here", "hello", "second sentence here", "first sentence here", "thank you"]
+
+    results = engine.translate_batch(texts, target_lang="es")
+
+    assert [result['translated_text'] for result in results] == [
+        "<es> row 0", "hola", "<es> row 1", "<es> row 0", "gracias",
+    ]
+
+
+def test_ascii_into_english_passes_through_only_from_english(engine):
+    assert engine.translate("good morning team", source_lang="en", target_lang="en")['method'] == 'passthrough'
+
+    result = engine.translate("hola amigo", source_lang="es", target_lang="en")
+    assert result['method'] != 'passthrough'
+    assert result['confidence'] < 1.0
+    [batch_result] = engine.translate_batch(["hola amigo"], source_lang="es", target_lang="en")
+    assert batch_result['method'] == result['method']
@@ -0,0 +1,56 @@
+"""
+Tests for utils.phrases.PhraseMatcher
+"""
+
+import pytest
+
+from utils import phrases
+from utils.phrases import PhraseMatcher, on_word_boundary
+
+pytestmark = pytest.mark.skipif(phrases.ahocorasick is None, reason="pyahocorasick not installed")
+
+TRANSLATIONS = {
+    "es": {
+        "hello": "hola",
+        "cart": "carrito",
+        "add to cart": "añadir al carrito",
+        "thank you": "gracias",
+    }
+}
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return PhraseMatcher(TRANSLATIONS)
+
+
+def test_replaces_every_known_phrase_and_keeps_the_gaps(matcher):
+    assert matcher.substitute("Hello friend, thank you!", "es") == "hola friend, gracias!"
+
+
+def test_longest_phrase_wins_at_the_same_position(matcher):
+    assert matcher.substitute("Add to cart now", "es") == "añadir al carrito now"
+
+
+def test_phrases_inside_longer_words_are_left_alone(matcher):
+    assert matcher.substitute("Othello carts", "es") is None
+    assert matcher.substitute("shopping-cart", "es") == "shopping-carrito"
+
+
+def test_unknown_language_or_no_match_returns_none(matcher):
+    assert matcher.substitute("hello", "de") is None
+    assert matcher.substitute("good night", "es") is None
+
+
+def test_precomputed_normalized_text_is_used(matcher):
+    assert matcher.substitute("  HELLO  ", "es", normalized_text="hello") == "hola"
+
+
+@pytest.mark.parametrize("text, start, end, expected", [
+    ("cart", 0, 4, True),
+    ("a cart.", 2, 6, True),
+    ("carts", 0, 4, False),
+    ("scart", 1, 5, False),
+])
+def test_on_word_boundary(text, start, end, expected):
+    assert on_word_boundary(text, start, end) is expected
@@ -0,0 +1,118 @@
+"""
+Tests for the rate limiters' window behavior, driven by a patched clock
+"""
+
+import pytest
+
+from tests.helpers import FakeRedis, import_entry_point
+from utils import rate_limiter
+from utils.rate_limiter import RateLimiter
+
+main = import_entry_point("main")
+codespace_app = import_entry_point("codespace_app")
+
+
+class _Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock(6000.0)  # the start of a 60 s window
+    monkeypatch.setattr(rate_limiter.time, "time", clock)
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock)
+    return clock
+
+
+def _allowed(limiter, client_ip, requests):
+    return sum(limiter.is_allowed(client_ip) for _ in range(requests))
+
+
+@pytest.mark.parametrize("redis_client", [None, FakeRedis()], ids=["memory", "redis"])
+def test_sliding_window_allows_the_limit_then_denies(clock, redis_client):
+    limiter = RateLimiter(redis_client=redis_client, limit=5, window=60)
+
+    assert _allowed(limiter, "1.2.3.4", 5) == 5
+    assert limiter.is_allowed("1.2.3.4") is False
+    # Clients are counted separately
+    assert limiter.is_allowed("5.6.7.8") is True
+
+
+def test_previous_window_is_weighted_by_its_overlap(clock):
+    limiter = RateLimiter(limit=10, window=60)
+    assert _allowed(limiter, "ip", 10) == 10
+
+    # A quarter into the next window, 3/4 of the previous 10 still count
+    clock.now += 75
+    assert _allowed(limiter, "ip", 10) == 3
+
+    # Two windows later nothing carries over
+    clock.now += 120
+    assert _allowed(limiter, "ip", 20) == 10
+
+
+def test_redis_counters_expire_after_the_next_window(clock):
+    redis_client = FakeRedis()
+    RateLimiter(redis_client=redis_client, limit=5, window=60).is_allowed("ip")
+
+    assert redis_client.ttls == {"rate_limit:ip:100": 120}
+
+
+def test_main_fixed_window_resets_each_minute(clock):
+    limiter = main.SimpleRateLimiter()
+
+    assert _allowed(limiter, "ip", limiter.limit + 1) == limiter.limit
+    clock.now += 60
+    assert limiter.is_allowed("ip") is True
+
+
+def test_main_eviction_keeps_only_recent_clients(clock):
+    limiter = main.SimpleRateLimiter(eviction_interval=3)
+    limiter.is_allowed("old")
+    clock.now += 120
+    limiter.is_allowed("new")
+    limiter.is_allowed("new")
+
+    assert set(limiter.slots) == {"new"}
+
+
+def test_main_redis_limiter_falls_back_when_redis_fails(clock):
+    class _BrokenRedis:
+        def pipeline(self, transaction=True):
+            raise ConnectionError("redis down")
+
+    fallback = main.SimpleRateLimiter()
+    limiter = main.RedisRateLimiter(_BrokenRedis(), fallback)
+
+    assert limiter.is_allowed("ip") is True
+    assert fallback.slots["ip"][1] == 1
+
+
+def test_codespace_token_bucket_refills_over_time(clock):
+    limiter = codespace_app.SimpleRateLimiter()
+
+    assert _allowed(limiter, "ip", limiter.limit + 1) == limiter.limit
+    # 100 tokens a minute is one every 0.6 s
+    clock.now += 0.6
+    assert _allowed(limiter, "ip", 2) == 1
+
+
+def test_codespace_token_bucket_forgets_least_recent_clients(clock):
+    limiter = codespace_app.SimpleRateLimiter(max_clients=2)
+    for client_ip in ("a", "b", "a", "c"):
+        limiter.is_allowed(client_ip)
+
+    assert list(limiter.buckets) == ["a", "c"]
+
+
+def test_codespace_sliding_window_weights_the_previous_minute(clock):
+    limiter = codespace_app.SlidingWindowRateLimiter()
+    assert _allowed(limiter, "ip", limiter.limit + 1) == limiter.limit
+
+    # Half way through the next minute half of the previous 100 still count
+    clock.now += 90
+    assert _allowed(limiter, "ip", limiter.limit) == 50
@@ -1,17 +1,22 @@
 """
 Lingua Translate Utilities Package
-Core utilities for translation, rate limiting, and conversation management
+Core utilities for rate limiting, conversation management, request batching,
+phrase substitution and JSON serialization
 """
 
 __version__ = "2.0.0"
 __author__ = "Your Name"
 
-from .translation_engine import AdvancedTranslationEngine
 from .conversation_manager import ConversationManager
 from .rate_limiter import RateLimiter
+from .batching import BatchCoalescer
+from .phrases import PhraseMatcher
+from .serialization import OrjsonProvider
 
 __all__ = [
-    'AdvancedTranslationEngine',
     'ConversationManager', 
-    'RateLimiter'
+    'RateLimiter',
+    'BatchCoalescer',
+    'PhraseMatcher',
+    'OrjsonProvider'
 ]
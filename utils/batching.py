@@ -0,0 +1,80 @@
+"""
+Request coalescing for translation models
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List
+
+import structlog
+
+logger = structlog.get_logger()
+
+
+class BatchCoalescer:
+    """
+    Coalesces concurrent translation requests for one model into batched calls
+
+    model takes a list of texts and returns their translations in order.
+    """
+
+    def __init__(self, model: Callable[[List[str]], List[str]], max_batch_size: int = 8,
+                 max_wait: float = 0.005, max_pending: int = 0):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        # 0 is unbounded; a bound makes a slow model shed load instead of queuing without limit
+        self.max_pending = max_pending
+        self.pending = None
+        self.worker = None
+        self._owner_pid = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_worker(self):
+        """Start the batching thread in this process (threads do not survive a pre-fork)"""
+        if self._owner_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._owner_pid != os.getpid():
+                self.pending = queue.Queue(maxsize=self.max_pending)
+                self.worker = threading.Thread(target=self._run, args=(self.pending,), daemon=True)
+                self.worker.start()
+                self._owner_pid = os.getpid()
+
+    def submit(self, text: str, timeout: float = 30.0) -> str:
+        """Queue a text for the next batch and wait for its translation; raises queue.Full when saturated"""
+        self._ensure_worker()
+        future = Future()
+        self.pending.put_nowait((text, future))
+        return future.result(timeout=timeout)
+
+    def _run(self, pending: queue.Queue):
+        while True:
+            # Block for the first item, then collect more for up to max_wait
+            batch = [pending.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            texts = [text for text, _ in batch]
+            try:
+                translations = self.model(texts)
+                if len(translations) != len(batch):
+                    raise RuntimeError(f"Model returned {len(translations)} translations for {len(batch)} texts")
+                for (_, future), translation in zip(batch, translations):
+                    future.set_result(translation)
+            except Exception as e:
+                logger.error(f"Batch translation failed: {e}")
+                for _, future in batch:
+                    # Never let a settled future kill the worker thread
+                    if not future.done():
+                        future.set_exception(e)
@@ -2,21 +2,39 @@
 Conversation Manager for maintaining context across translation sessions
 """
 
-import json
 import time
-from typing import Dict, List, Optional
+from collections import deque
+from itertools import islice
+from typing import Dict, List, Optional, Sequence
+import msgpack
 import structlog
 
 logger = structlog.get_logger()
 
+CONTEXT_EXCHANGES = 3  # Number of recent exchanges used as context
+
+# History is a Redis list. The original layout kept a SETEX JSON string at
+# "conversation:{session_id}"; a list command on one of those fails with WRONGTYPE
+# and takes the whole pipeline down, so lists live under their own name.
+# The old strings expire on their own within the hour.
+CONVERSATION_KEY_PREFIX = "conversation:v2:"
+
+def conversation_key(session_id: str) -> str:
+    """Redis key holding a session's exchange list"""
+    return f"{CONVERSATION_KEY_PREFIX}{session_id}"
+
 class ConversationManager:
     def __init__(self, redis_client=None, max_history=10):
         self.redis_client = redis_client
         self.max_history = max_history
-        self.memory_store = {}  # Fallback when Redis unavailable
+        self.memory_store = {}  # Fallback when Redis unavailable; session_id -> bounded deque
 
-    def add_exchange(self, session_id: str, user_text: str, translation: str):
-        """Add a new exchange to conversation history"""
+    def add_exchange(self, session_id: str, user_text: str, translation: str, pipe=None):
+        """Add a new exchange to conversation history
+
+        When a Redis pipeline is passed the commands are queued on it and
+        the caller is responsible for executing it.
+        """
         try:
             exchange = {
                 'user_text': user_text,
@@ -25,23 +43,21 @@ class ConversationManager:
             }
             
             if self.redis_client:
-                key = f"conversation:{session_id}"
-                history = self._get_history(session_id)
-                history.append(exchange)
-                
+                key = conversation_key(session_id)
+                target = pipe if pipe is not None else self.redis_client.pipeline(transaction=False)
+                # Needs a binary-safe client (decode_responses=False)
+                target.rpush(key, msgpack.packb(exchange))
                 # Keep only recent exchanges
-                if len(history) > self.max_history:
-                    history = history[-self.max_history:]
-                
-                self.redis_client.setex(key, 3600, json.dumps(history))
+                target.ltrim(key, -self.max_history, -1)
+                target.expire(key, 3600)
+                if pipe is None:
+                    target.execute()
             else:
-                # Fallback to memory
-                if session_id not in self.memory_store:
-                    self.memory_store[session_id] = []
-                
-                self.memory_store[session_id].append(exchange)
-                if len(self.memory_store[session_id]) > self.max_history:
-                    self.memory_store[session_id] = self.memory_store[session_id][-self.max_history:]
+                # Fallback to memory; the deque drops the oldest exchange itself
+                history = self.memory_store.get(session_id)
+                if history is None:
+                    history = self.memory_store[session_id] = deque(maxlen=self.max_history)
+                history.append(exchange)
                     
         except Exception as e:
             logger.warning(f"Failed to store conversation: {e}")
@@ -49,29 +65,45 @@ class ConversationManager:
     def get_context(self, session_id: str) -> str:
         """Get conversation context for translation"""
         try:
-            history = self._get_history(session_id)
-            if not history:
-                return ""
-            
-            # Build context from recent exchanges
-            context_parts = []
-            for exchange in history[-3:]:  # Last 3 exchanges
-                context_parts.append(f"Previous: {exchange['user_text']} -> {exchange['translation']}")
-            
-            return " | ".join(context_parts)
-            
+            if self.redis_client:
+                key = conversation_key(session_id)
+                return self.context_from_raw(self.redis_client.lrange(key, -CONTEXT_EXCHANGES, -1))
+            return self._build_context(self.memory_store.get(session_id, ()))
+
         except Exception as e:
             logger.warning(f"Failed to get context: {e}")
             return ""
 
+    def queue_context(self, pipe, session_id: str):
+        """Queue the context read on a Redis pipeline; decode with context_from_raw"""
+        pipe.lrange(conversation_key(session_id), -CONTEXT_EXCHANGES, -1)
+
+    def context_from_raw(self, raw_exchanges: Optional[List]) -> str:
+        """Build context from the raw list entries returned by Redis"""
+        try:
+            return self._build_context([msgpack.unpackb(item) for item in raw_exchanges or []])
+        except Exception as e:
+            logger.warning(f"Failed to decode context: {e}")
+            return ""
+
+    def _build_context(self, history: Sequence[Dict]) -> str:
+        """Build context string from recent exchanges"""
+        if not history:
+            return ""
+
+        context_parts = []
+        for exchange in islice(history, max(0, len(history) - CONTEXT_EXCHANGES), None):
+            context_parts.append(f"Previous: {exchange['user_text']} -> {exchange['translation']}")
+
+        return " | ".join(context_parts)
+
     def _get_history(self, session_id: str) -> List[Dict]:
         """Get conversation history for session"""
         try:
             if self.redis_client:
-                key = f"conversation:{session_id}"
-                data = self.redis_client.get(key)
-                return json.loads(data) if data else []
+                key = conversation_key(session_id)
+                return [msgpack.unpackb(item) for item in self.redis_client.lrange(key, 0, -1)]
             else:
-                return self.memory_store.get(session_id, [])
+                return list(self.memory_store.get(session_id, ()))
         except:
             return []
@@ -0,0 +1,72 @@
+"""
+In-text dictionary phrase substitution
+"""
+
+from typing import Dict, Optional
+import structlog
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+logger = structlog.get_logger()
+
+def on_word_boundary(text: str, start: int, end: int) -> bool:
+    """True if text[start:end] is not part of a longer word"""
+    return ((start == 0 or not text[start - 1].isalnum()) and
+            (end == len(text) or not text[end].isalnum()))
+
+class PhraseMatcher:
+    """Replaces every known dictionary phrase inside a text in a single Aho-Corasick scan"""
+
+    def __init__(self, translations: Dict[str, Dict[str, str]]):
+        """translations maps a target language to its {normalized phrase: translation} dictionary"""
+        self._automata = {}
+        if ahocorasick is None:
+            logger.warning("pyahocorasick not available - dictionary limited to exact phrase matches")
+            return
+        
+        for lang, lang_dict in translations.items():
+            automaton = ahocorasick.Automaton()
+            for phrase, translation in lang_dict.items():
+                automaton.add_word(phrase, (len(phrase), translation))
+            automaton.make_automaton()
+            self._automata[lang] = automaton
+
+    def substitute(self, text: str, target_lang: str, normalized_text: Optional[str] = None) -> Optional[str]:
+        """
+        Translate the known phrases inside text, or return None when none match
+
+        normalized_text is the form the dictionary keys use (text.strip().lower()
+        by default); callers that already computed it can pass it in.
+        """
+        automaton = self._automata.get(target_lang)
+        if automaton is None:
+            return None
+        
+        stripped = text.strip()
+        text_lower = normalized_text if normalized_text is not None else stripped.lower()
+        # Leftmost match first, longest phrase wins when several start at the same position
+        matches = sorted(
+            ((end - length + 1, length, translation)
+             for end, (length, translation) in automaton.iter(text_lower)),
+            key=lambda match: (match[0], -match[1])
+        )
+        # Copy untranslated gaps from the original text unless normalizing changed offsets
+        source = stripped if len(stripped) == len(text_lower) else text_lower
+        
+        parts = []
+        position = 0
+        for start, length, translation in matches:
+            end = start + length
+            if start < position or not on_word_boundary(text_lower, start, end):
+                continue
+            parts.append(source[position:start])
+            parts.append(translation)
+            position = end
+        
+        if not parts:
+            return None
+        parts.append(source[position:])
+        return "".join(parts)
@@ -9,45 +9,50 @@ import structlog
 logger = structlog.get_logger()
 
 class RateLimiter:
+    """
+    Sliding-window rate limiter approximated from two fixed-window counters:
+    the previous window's count is weighted by how much of it still overlaps
+    the sliding window
+    """
     def __init__(self, redis_client=None, limit=100, window=60):
         self.redis_client = redis_client
         self.limit = limit
         self.window = window
-        self.memory_store = {}  # Fallback
+        self.memory_store = {}  # Fallback; client_ip -> [window_id, current_count, previous_count]
 
     def is_allowed(self, client_ip: str) -> bool:
         """Check if request is within rate limit"""
         try:
-            current_time = int(time.time())
+            now = time.time()
+            window_id = int(now // self.window)
+            previous_weight = 1 - (now % self.window) / self.window
             
             if self.redis_client:
-                key = f"rate_limit:{client_ip}"
-                pipe = self.redis_client.pipeline()
-                pipe.zremrangebyscore(key, 0, current_time - self.window)
-                pipe.zcard(key)
-                pipe.zadd(key, {str(current_time): current_time})
-                pipe.expire(key, self.window)
-                results = pipe.execute()
+                key = f"rate_limit:{client_ip}:{window_id}"
+                pipe = self.redis_client.pipeline(transaction=False)
+                pipe.incr(key)
+                # Kept through the next window, where it is the previous count
+                pipe.expire(key, 2 * self.window)
+                pipe.get(f"rate_limit:{client_ip}:{window_id - 1}")
+                current_count, _, previous_count = pipe.execute()
                 
-                request_count = results[1]
-                return request_count < self.limit
+                # current_count already includes this request
+                return int(previous_count or 0) * previous_weight + current_count <= self.limit
             else:
                 # Memory fallback
-                if client_ip not in self.memory_store:
-                    self.memory_store[client_ip] = []
+                counters = self.memory_store.get(client_ip)
+                if counters is None:
+                    counters = self.memory_store[client_ip] = [window_id, 0, 0]
+                elif counters[0] != window_id:
+                    # Roll forward; a gap of more than one window leaves nothing to carry
+                    counters[2] = counters[1] if counters[0] == window_id - 1 else 0
+                    counters[0] = window_id
+                    counters[1] = 0
                 
-                # Clean old requests
-                cutoff = current_time - self.window
-                self.memory_store[client_ip] = [
-                    req_time for req_time in self.memory_store[client_ip] 
-                    if req_time > cutoff
-                ]
-                
-                # Check limit
-                if len(self.memory_store[client_ip]) >= self.limit:
+                if counters[2] * previous_weight + counters[1] >= self.limit:
                     return False
                 
-                self.memory_store[client_ip].append(current_time)
+                counters[1] += 1
                 return True
                 
         except Exception as e:
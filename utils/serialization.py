@@ -0,0 +1,22 @@
+"""
+orjson-backed serializers shared by the Flask apps
+"""
+
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+def orjson_dumps(obj, **kwargs) -> str:
+    """structlog serializer; the stdlib logging sink expects str, not bytes"""
+    return orjson.dumps(obj, **kwargs).decode()
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson, so request.get_json() and jsonify()
+    parse and emit via orjson; emits UTF-8 instead of \\uXXXX escapes
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
@@ -0,0 +1,8 @@
+"""
+WSGI entry point for the main.py translation service
+Usage: gunicorn -c gunicorn_main_conf.py  (gunicorn_main_conf.py points at wsgi:app)
+"""
+
+from main import create_app
+
+app = create_app()